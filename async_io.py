@@ -0,0 +1,44 @@
+"""Blocking file I/O moved off the game loop onto one worker thread.
+
+Operations run one at a time in submission order, so a read queued after a write to the same
+file sees it. submit_io() queues a write without waiting; coroutines await run_io() and get the
+result back on the loop thread, where it is safe to update the game's module globals. Until
+start() is called (batch tools, scripts) and in the browser build, which has no threads,
+everything runs inline instead.
+"""
+import asyncio
+import platform
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+def start():
+    """Moves file I/O onto the worker thread; called once by the game at startup."""
+    global _EXECUTOR
+    if _EXECUTOR is None and platform.system() != "Emscripten":
+        _EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-io')
+
+def _run_inline(func: Callable, *args) -> Future:
+    future = Future()
+    try: future.set_result(func(*args))
+    except Exception as e: future.set_exception(e)
+    return future
+
+def _report_error(future: Future):
+    if future.exception() is not None: print(f"!! ERROR: Background file operation failed: {future.exception()!r}")
+
+def submit_io(func: Callable, *args) -> Future:
+    """Queues func(*args) on the I/O thread; errors of writes nobody awaits are logged."""
+    if _EXECUTOR is None: return _run_inline(func, *args)
+    try:
+        future = _EXECUTOR.submit(func, *args)
+    except RuntimeError: # Interpreter shutdown: the worker is gone, so finish the write here.
+        return _run_inline(func, *args)
+    future.add_done_callback(_report_error)
+    return future
+
+async def run_io(func: Callable, *args) -> Any:
+    """Runs func(*args) on the I/O thread and returns its result to the awaiting coroutine."""
+    future = submit_io(func, *args)
+    return future.result() if future.done() else await asyncio.wrap_future(future)
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""Headless batch solver: solves whole level packs and streams a CSV or JSON Lines report.
+
+    python batch_solve.py [PACK ...] [--workers N] [--time-limit S] [--memory-limit MB] [--format csv|json] [-o FILE]
+
+Solves the built-in levels and custom_levels/ (unless --no-base / --no-custom) plus every pack
+given. A pack is a .json file holding one level grid or a list of them, an .xsb file holding one
+level, or a directory of such files. Rows are written as each level finishes, so memory use does not grow with the batch size.
+Levels with the same content hash (the same layout, however padded or placed) are solved once;
+their copies get the first one's result with duplicate_of set to its name.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core import get_initial_board, get_level_hash
+from save_load import load_level, LEVEL_SUFFIXES
+from solver import ALGORITHMS, PROGRESS_INTERVAL, SolverStats, solve
+
+REPORT_FIELDS = ['source', 'level', 'status', 'solvable', 'length', 'expanded', 'peak_frontier', 'seconds', 'peak_memory_mb', 'duplicate_of']
+
+class LimitExceeded(Exception):
+    """Raised from the progress callback to abort a solve that ran out of time or memory."""
+    def __init__(self, status: str):
+        super().__init__(status); self.status = status
+
+def _memory_mb() -> float:
+    """Resident set size of this process in MB, or 0 where it cannot be measured."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+    except ImportError:
+        return 0.0
+
+def iter_pack(path: Path) -> Iterator[Tuple[str, str, list]]:
+    """Yields (source, level name, grid) for a pack file or every .json/.xsb pack in a directory."""
+    files = sorted((p for p in path.iterdir() if p.suffix in LEVEL_SUFFIXES), key=os.path.getmtime) if path.is_dir() else [path]
+    for file_path in files:
+        data = load_level(file_path)
+        if not isinstance(data, list) or not data or not isinstance(data[0], list):
+            print(f"Skipping {file_path}: not a level grid or list of grids", file=sys.stderr); continue
+        if isinstance(data[0][0], list):
+            for i, grid in enumerate(data): yield str(file_path), f"{file_path.name}#{i + 1}", grid
+        else:
+            yield str(file_path), file_path.name, data
+
+def iter_levels(packs, include_base: bool = True, custom_dir: Optional[Path] = None) -> Iterator[Tuple[str, str, list]]:
+    if include_base:
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # game imports pygame; keep stdout clean for the report.
+        from game import INITIAL_LEVELS
+        for i, grid in enumerate(INITIAL_LEVELS): yield 'base', f'base_{i}', grid
+    if custom_dir is not None and custom_dir.is_dir():
+        yield from iter_pack(custom_dir)
+    for pack in packs:
+        yield from iter_pack(Path(pack))
+
+def solve_level(task: Tuple[str, str, list, str, int, Optional[float], Optional[float]]) -> dict:
+    """Solves one level under the time/memory limits and returns its report row."""
+    source, name, grid, algorithm, max_iters, time_limit, memory_limit = task
+    # bfs keeps its visited table within the limit itself, spilling old layers to disk.
+    table_limit = memory_limit if algorithm == 'bfs' else None
+    row = dict.fromkeys(REPORT_FIELDS, ''); row.update(source=source, level=name)
+    start = time.time(); base_memory = _memory_mb(); peak_memory = [0.0]
+
+    def check_limits(stats: SolverStats):
+        used = _memory_mb() - base_memory; peak_memory[0] = max(peak_memory[0], used)
+        if time_limit and time.time() - start > time_limit: raise LimitExceeded('timeout')
+        if memory_limit and not table_limit and used > memory_limit: raise LimitExceeded('memory')
+
+    stats = SolverStats(progress=check_limits)
+    try:
+        kwargs = {'max_memory_mb': table_limit} if table_limit else {}
+        solution = solve(get_initial_board(grid), algorithm, max_iters=max_iters, stats=stats, **kwargs)
+        if stats.exhausted:
+            row['status'] = 'iteration_limit'
+        else:
+            row.update(status='solved' if solution is not None else 'unsolvable', solvable=solution is not None,
+                       length=len(solution) if solution is not None else '')
+    except LimitExceeded as e:
+        row['status'] = e.status
+    except MemoryError:
+        row['status'] = 'memory'
+    except Exception as e:
+        row['status'] = f'error: {e}'
+    # The frontier is only sampled every PROGRESS_INTERVAL expansions; smaller searches leave it blank.
+    row.update(expanded=stats.expanded, peak_frontier=stats.peak_frontier if stats.expanded >= PROGRESS_INTERVAL else '',
+               seconds=round(time.time() - start, 3), peak_memory_mb=round(peak_memory[0], 1))
+    return row
+
+def _solve_task(task: Tuple[str, tuple]) -> Tuple[str, dict]:
+    level_hash, task = task
+    return level_hash, solve_level(task) if task[2] is not None else {'source': task[0], 'level': task[1]}
+
+def _init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C is handled by the parent, which terminates the pool.
+
+def run_batch(levels, out, fmt: str = 'csv', algorithm: str = 'astar', workers: Optional[int] = None, max_iters: int = sys.maxsize,
+              time_limit: Optional[float] = None, memory_limit: Optional[float] = None) -> dict:
+    """Solves levels across worker processes, writing one report row per level as it finishes."""
+    seen = set() # Touched only by the pool's task feeder; duplicates are sent without their grid.
+    def tasks():
+        for source, name, grid in levels:
+            level_hash = get_level_hash(get_initial_board(grid)); first = level_hash not in seen; seen.add(level_hash)
+            yield level_hash, (source, name, grid if first else None, algorithm, max_iters, time_limit, memory_limit)
+    writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS) if fmt == 'csv' else None
+    if writer: writer.writeheader()
+    counts = {}; solved: Dict[str, dict] = {}; waiting: Dict[str, List[dict]] = {}
+    def write(row):
+        if writer: writer.writerow(row)
+        else: out.write(json.dumps(row) + '\n')
+        out.flush()
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    def write_duplicate(row, duplicate):
+        write(dict(row, source=duplicate['source'], level=duplicate['level'], duplicate_of=row['level']))
+    with multiprocessing.Pool(workers or os.cpu_count() or 1, initializer=_init_worker) as pool:
+        for level_hash, row in pool.imap_unordered(_solve_task, tasks()):
+            if 'status' in row:
+                solved[level_hash] = row; write(row)
+                for duplicate in waiting.pop(level_hash, []): write_duplicate(row, duplicate)
+            elif level_hash in solved: write_duplicate(solved[level_hash], row)
+            else: waiting.setdefault(level_hash, []).append(row) # Its original is still being solved.
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve Sokoban level packs and report solver stats.")
+    parser.add_argument('packs', nargs='*', help="level pack files or directories of .json/.xsb levels")
+    parser.add_argument('--no-base', action='store_true', help="skip the built-in levels")
+    parser.add_argument('--no-custom', action='store_true', help="skip the custom_levels/ directory")
+    parser.add_argument('--custom-dir', type=Path, default=Path("custom_levels"))
+    # The parallel solver needs its own processes, which pool workers cannot start.
+    parser.add_argument('--algorithm', choices=sorted(set(ALGORITHMS) - {'parallel'}), default='astar')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--max-iters', type=int, default=sys.maxsize, help="expansions per level (default: unbounded)")
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds per level")
+    parser.add_argument('--memory-limit', type=float, default=None,
+                        help="MB of extra memory per level (for bfs: the visited table's budget, spilling to disk)")
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv', help="CSV or JSON Lines")
+    parser.add_argument('-o', '--output', type=Path, default=None, help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    levels = iter_levels(args.packs, not args.no_base, None if args.no_custom else args.custom_dir)
+    out = args.output.open('w', newline='') if args.output else sys.stdout
+    start = time.time()
+    try:
+        counts = run_batch(levels, out, args.format, args.algorithm, args.workers, args.max_iters, args.time_limit, args.memory_limit)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr); return 1
+    finally:
+        if args.output: out.close()
+    summary = ', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"Solved batch in {time.time() - start:.1f}s: {summary or 'no levels'}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -1,9 +1,22 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, List, NamedTuple
+from array import array
+import hashlib
 import numpy as np
 from constants import GameObject
 
 Board = np.ndarray
 
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+LURD_LETTERS = 'udlr'
+_LURD_INDEX = {c: i % len(DIRECTIONS) for i, c in enumerate(LURD_LETTERS + LURD_LETTERS.upper())}
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Per-layout results, least recently used first; bounded so long batch runs don't keep every level.
+LAYOUT_CACHE_SIZE = 32
+_PUSH_DISTANCES_CACHE: Dict[tuple, Board] = {}
+_DEAD_SQUARES_CACHE: Dict[tuple, Board] = {}
+
 def get_initial_board(level_data: list) -> Board:
     """Converts level data into a NumPy array board."""
     max_width = max(len(row) for row in level_data) if level_data else 0
@@ -12,10 +25,103 @@ def get_initial_board(level_data: list) -> Board:
         board[i, :len(row)] = row
     return board
 
+def canonical_board(board: Board, symmetric: bool = False) -> Board:
+    """The level reduced to what can be played: floor the player cannot reach becomes wall and the
+    grid is cropped to one ring of wall around the rest, so copies drawn at another offset or with
+    other padding compare equal. symmetric=True also picks the least of the 8 rotations and
+    reflections, which matches mirrored copies but no longer shares solutions."""
+    wall = GameObject.WALL.value
+    is_open = board != wall
+    players = np.argwhere(board == GameObject.PLAYER.value)
+    if len(players):
+        start = tuple(players[0]); reached = np.zeros_like(is_open); reached[start] = True; stack = [start]; height, width = board.shape
+        while stack:
+            r, c = stack.pop()
+            for dr, dc in DIRECTIONS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < height and 0 <= nc < width and is_open[nr, nc] and not reached[nr, nc]:
+                    reached[nr, nc] = True; stack.append((nr, nc))
+        keep = reached | (is_open & (board != GameObject.EMPTY.value)) # Stray boxes/targets stay.
+    else: keep = is_open
+    rows, cols = np.nonzero(keep)
+    if not len(rows): return np.full((0, 0), wall, dtype=np.int8)
+    grid = np.where(keep, board, wall)[rows.min():rows.max() + 1, cols.min():cols.max() + 1]
+    grid = np.pad(grid, 1, constant_values=wall).astype(np.int8)
+    if symmetric:
+        variants = (np.rot90(g, k) for g in (grid, np.fliplr(grid)) for k in range(4))
+        grid = np.ascontiguousarray(min(variants, key=lambda v: (v.shape, v.tobytes())))
+    return grid
+
+def get_level_hash(board: Board, symmetric: bool = False) -> str:
+    """Returns a content hash of a level's canonical grid, independent of its filename, key or padding."""
+    grid = canonical_board(board, symmetric)
+    return hashlib.sha1(repr(grid.shape).encode() + grid.tobytes()).hexdigest()
+
+def solution_to_lurd(solution: List[Tuple[int, int]]) -> str:
+    """Encodes a list of directions as a LURD string (u, d, l, r per move, lowercase)."""
+    return ''.join(LURD_LETTERS[DIRECTIONS.index(tuple(d))] for d in solution)
+
+def lurd_to_solution(moves: str) -> List[Tuple[int, int]]:
+    """Decodes a LURD string (either case) into a list of directions."""
+    try:
+        return [DIRECTIONS[LURD_LETTERS.index(c)] for c in moves.lower()]
+    except ValueError:
+        raise ValueError(f"Invalid LURD move string: {moves!r}") from None
+
 def get_targets_mask(board: Board) -> Board:
     """Returns a mask of target locations."""
     return board == GameObject.TARGET.value
 
+def _layout_key(board: Board) -> tuple:
+    """Cache key for a level's static layer: its shape, walls and targets."""
+    return (board.shape, (board == GameObject.WALL.value).tobytes(), get_targets_mask(board).tobytes())
+
+def _cache_get(cache: Dict[tuple, Board], key: tuple) -> Optional[Board]:
+    value = cache.pop(key, None)
+    if value is not None: cache[key] = value # Most recently used goes last.
+    return value
+
+def _cache_put(cache: Dict[tuple, Board], key: tuple, value: Board):
+    if len(cache) >= LAYOUT_CACHE_SIZE: del cache[next(iter(cache))]
+    cache[key] = value
+
+def get_push_distances(board: Board) -> Board:
+    """Returns, per target, the fewest pushes that bring a lone box from each cell onto it.
+
+    Boxes are pulled backwards from every target; cells no pull can reach hold UNREACHABLE.
+    Results are cached per static layout (walls and targets), so every board of a level shares one;
+    the LAYOUT_CACHE_SIZE most recently used layouts are kept.
+    """
+    key = _layout_key(board); cached = _cache_get(_PUSH_DISTANCES_CACHE, key)
+    if cached is not None: return cached
+    h, w = board.shape; walls = board == GameObject.WALL.value
+    is_floor = lambda i, j: 0 <= i < h and 0 <= j < w and not walls[i, j]
+    targets = np.argwhere(get_targets_mask(board))
+    distances = np.full((len(targets), h, w), UNREACHABLE, dtype=np.int32)
+    for t, (ti, tj) in enumerate(targets):
+        dist = distances[t]; dist[ti, tj] = 0; frontier = [(ti, tj)]
+        while frontier:
+            next_frontier = []
+            for i, j in frontier:
+                for di, dj in DIRECTIONS:
+                    bi, bj = i - di, j - dj
+                    if is_floor(bi, bj) and is_floor(bi - di, bj - dj) and dist[bi, bj] == UNREACHABLE:
+                        dist[bi, bj] = dist[i, j] + 1; next_frontier.append((bi, bj))
+            frontier = next_frontier
+    distances.setflags(write=False)
+    _cache_put(_PUSH_DISTANCES_CACHE, key, distances)
+    return distances
+
+def get_dead_squares_mask(board: Board) -> Board:
+    """Returns a mask of floor cells from which a box can never be pushed onto any target."""
+    key = _layout_key(board); cached = _cache_get(_DEAD_SQUARES_CACHE, key)
+    if cached is not None: return cached
+    distances = get_push_distances(board)
+    live = (distances != UNREACHABLE).any(axis=0)
+    dead = (board != GameObject.WALL.value) & ~live; dead.setflags(write=False)
+    _cache_put(_DEAD_SQUARES_CACHE, key, dead)
+    return dead
+
 def find_player(board: Board) -> Optional[Tuple[int, int]]:
     """Finds the player's position on the board."""
     pos = np.argwhere(board == GameObject.PLAYER.value)
@@ -46,4 +152,275 @@ def move(board: Board, direction: Tuple[int, int], target_mask: Board) -> Option
         new_board[ni, nj] = GameObject.PLAYER.value
         new_board[pi, pj] = GameObject.TARGET.value if target_mask[pi, pj] else GameObject.EMPTY.value
         return new_board
-    return None
\ No newline at end of file
+    return None
+
+class State(NamedTuple):
+    """Dynamic part of a position: the player's flat cell index and a bitmask of box cells."""
+    player: int
+    boxes: int
+
+class LevelLayout:
+    """Flattened static layer of a level, shared by the game and the compact solver engine.
+
+    Cells are indexed row-major (i * width + j). A dynamic State is the player's cell index plus
+    a bitmask of box cells, a few dozen bytes however large the board; pack_state folds both into
+    a single int key. Cell sets such as the floor are bitmasks too, so reach_mask can flood-fill
+    with whole-board shifts. tiles holds the static grid (walls, floor and targets) as int8.
+    """
+    def __init__(self, board: Board):
+        self.height, self.width = board.shape
+        self.size = self.height * self.width
+        self.floor = (board != GameObject.WALL.value).ravel()
+        self.tiles = np.where(self.floor, GameObject.EMPTY.value, GameObject.WALL.value).astype(np.int8)
+        self.tiles[get_targets_mask(board).ravel()] = GameObject.TARGET.value
+        self.targets = cells_to_mask(np.flatnonzero(get_targets_mask(board)))
+        self.dead = cells_to_mask(np.flatnonzero(get_dead_squares_mask(board)))
+        self.push_distances = get_push_distances(board).reshape(-1, self.size)
+        self.neighbours = np.full((self.size, len(DIRECTIONS)), -1, dtype=np.int32)
+        for d, (di, dj) in enumerate(DIRECTIONS):
+            for cell in np.flatnonzero(self.floor):
+                i, j = divmod(int(cell), self.width); ni, nj = i + di, j + dj
+                if 0 <= ni < self.height and 0 <= nj < self.width and self.floor[ni * self.width + nj]:
+                    self.neighbours[cell, d] = ni * self.width + nj
+        self._neighbours: List[List[int]] = self.neighbours.tolist() # Plain ints for per-move lookups.
+        self._is_target: List[int] = (self.tiles == GameObject.TARGET.value).astype(int).tolist()
+        self.player_bits = max(1, (self.size - 1).bit_length())
+        self.key_bytes = (self.size + self.player_bits + 7) // 8
+        self.zobrist = ZobristKeys(self.size)
+        column = np.arange(self.size) % self.width
+        self.floor_mask = cells_to_mask(np.flatnonzero(self.floor))
+        self._not_first_column = cells_to_mask(np.flatnonzero(column != 0))
+        self._not_last_column = cells_to_mask(np.flatnonzero(column != self.width - 1))
+        # Batch engine tables: box sets as rows of packed bits, cell c in byte c >> 3, bit c & 7.
+        cells = np.arange(self.size)
+        self.box_bytes = (self.size + 7) // 8
+        self._cell_byte = cells >> 3; self._cell_bit = (1 << (cells & 7)).astype(np.uint8)
+        self._dead_cells = np.zeros(self.size, dtype=bool); self._dead_cells[mask_to_cells(self.dead)] = True
+        self._off_target_bits = self.pack_boxes(self.floor_mask & ~self.targets)
+
+    def initial_state(self, board: Board) -> Optional[State]:
+        """Returns the State of a board, or None if it has no player."""
+        player = np.flatnonzero(board == GameObject.PLAYER.value)
+        if len(player) == 0: return None
+        return State(int(player[0]), cells_to_mask(np.flatnonzero(board == GameObject.BOX.value)))
+
+    def replay(self, state: State, moves: str) -> Tuple[State, int, int]:
+        """Plays a LURD string (either case) from state, stopping at the first blocked move.
+
+        Returns (final state, moves played, pushes); the string is legal iff all of it was played.
+        Raises ValueError on a letter that is not a LURD move.
+        """
+        neighbours = self._neighbours; player, boxes = state; pushes = 0
+        for played, letter in enumerate(moves):
+            d = _LURD_INDEX.get(letter)
+            if d is None: raise ValueError(f"Invalid LURD move {letter!r} at position {played}")
+            step = neighbours[player][d]
+            if step < 0: return State(player, boxes), played, pushes
+            if boxes >> step & 1:
+                dest = neighbours[step][d]
+                if dest < 0 or boxes >> dest & 1: return State(player, boxes), played, pushes
+                boxes ^= (1 << step) | (1 << dest); pushes += 1
+            player = step
+        return State(player, boxes), len(moves), pushes
+
+    def is_win(self, state: State) -> bool:
+        """State-level counterpart of is_win(): at least one box, and every box on a target."""
+        return state.boxes != 0 and not state.boxes & ~self.targets
+
+    def boxes_on_targets(self, state: State) -> int:
+        return bin(state.boxes & self.targets).count('1')
+
+    def to_board(self, state: State) -> Board:
+        """Expands a State back into a full board grid, e.g. for the editor or old callers."""
+        board = self.tiles.astype(int)
+        board[mask_to_cells(state.boxes)] = GameObject.BOX.value; board[state.player] = GameObject.PLAYER.value
+        return board.reshape(self.height, self.width)
+
+    def pack_state(self, player: int, boxes: int) -> int:
+        return (boxes << self.player_bits) | player
+
+    def unpack_state(self, key: int) -> Tuple[int, int]:
+        return key & ((1 << self.player_bits) - 1), key >> self.player_bits
+
+    def reach_mask(self, player: int, boxes: int) -> int:
+        """Bitmask of the cells the player can walk to around the boxes.
+
+        Grows the region one step in every direction per iteration using shifts of the whole
+        bitmask, so the cost is a few big-int operations per step of the region's diameter.
+        """
+        free = self.floor_mask & ~boxes; width = self.width
+        reach = 1 << player
+        while True:
+            grown = (reach | (reach << 1 & self._not_first_column) | (reach >> 1 & self._not_last_column)
+                     | reach << width | reach >> width) & free
+            if grown == reach: return reach
+            reach = grown
+
+    def normalize_player(self, player: int, boxes: int) -> Tuple[int, int]:
+        """Returns (top-left-most reachable cell, reach mask), a canonical player cell for the region."""
+        reach = self.reach_mask(player, boxes)
+        return (reach & -reach).bit_length() - 1, reach
+
+    def pack_boxes(self, boxes: int) -> np.ndarray:
+        """Converts a box bitmask to a packed row for the batch engine."""
+        return np.frombuffer(boxes.to_bytes(self.box_bytes, 'little'), dtype=np.uint8).copy()
+
+    def successors(self, players: np.ndarray, boxes: np.ndarray):
+        """Expands N states in all four directions at once.
+
+        players is an int array (N,) of cells and boxes a uint8 array (N, box_bytes) of packed
+        rows. Returns (valid, pushed, next_players, next_boxes): valid and pushed are (N, 4)
+        masks of legal moves and of those that push a box (never onto a dead square), and the
+        next_* arrays hold one successor per legal move in np.nonzero(valid) order.
+        """
+        rows = np.arange(len(players))[:, None]
+        step = self.neighbours[players]; valid = step >= 0; step = np.where(valid, step, 0)
+        pushed = (boxes[rows, self._cell_byte[step]] & self._cell_bit[step]).astype(bool) & valid
+        dest = self.neighbours[step, np.arange(len(DIRECTIONS))]; open_dest = dest >= 0; dest = np.where(open_dest, dest, 0)
+        open_dest &= ~(boxes[rows, self._cell_byte[dest]] & self._cell_bit[dest]).astype(bool) & ~self._dead_cells[dest]
+        valid &= ~pushed | open_dest; pushed &= valid
+        parents, directions = np.nonzero(valid)
+        next_players = step[parents, directions]; next_boxes = boxes[parents]
+        moved = np.flatnonzero(pushed[parents, directions])
+        src, dst = next_players[moved], dest[parents[moved], directions[moved]]
+        next_boxes[moved, self._cell_byte[src]] ^= self._cell_bit[src]
+        next_boxes[moved, self._cell_byte[dst]] |= self._cell_bit[dst]
+        return valid, pushed, next_players, next_boxes
+
+    def solved_rows(self, boxes: np.ndarray) -> np.ndarray:
+        """Mask of the packed box rows with every box on a target."""
+        return ~(boxes & self._off_target_bits).any(axis=1)
+
+    def to_coords(self, cell: int) -> Tuple[int, int]:
+        return divmod(cell, self.width)
+
+class MoveHistory:
+    """Delta-encoded move history of one attempt at a level.
+
+    Each move is one byte, its direction index << 1 | whether it pushed a box, and the State
+    after every CHECKPOINT_INTERVAL moves is kept so state_at can rebuild any earlier position
+    by replaying at most that many deltas. Undone moves wait on a redo stack until the next move.
+    The count of boxes on targets is kept up to date move by move, so is_solved is O(1).
+    """
+    CHECKPOINT_INTERVAL = 64
+
+    def __init__(self, layout: LevelLayout, start: State):
+        self.layout = layout; self.start = start
+        self.deltas = array('B'); self.redo_deltas = array('B'); self.reset()
+
+    def reset(self):
+        self.state = self.start; self.checkpoints: List[State] = [self.start]
+        self.box_count = bin(self.start.boxes).count('1'); self.on_targets = self.layout.boxes_on_targets(self.start)
+        del self.deltas[:]; del self.redo_deltas[:]
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    def _replay(self, state: State, delta: int) -> State:
+        d = delta >> 1; step = self.layout._neighbours[state.player][d]; boxes = state.boxes
+        if delta & 1: boxes ^= (1 << step) | (1 << self.layout._neighbours[step][d])
+        return State(step, boxes)
+
+    def _advance(self, delta: int):
+        """Plays a legal delta on the current state, updating the boxes-on-targets count."""
+        d = delta >> 1; neighbours, is_target = self.layout._neighbours, self.layout._is_target
+        player, boxes = self.state; step = neighbours[player][d]
+        if delta & 1:
+            dest = neighbours[step][d]; boxes ^= (1 << step) | (1 << dest)
+            self.on_targets += is_target[dest] - is_target[step]
+        self.state = State(step, boxes); self.deltas.append(delta)
+        if len(self.deltas) % self.CHECKPOINT_INTERVAL == 0: self.checkpoints.append(self.state)
+
+    def push(self, direction: Tuple[int, int]) -> Optional[State]:
+        """Plays a move and clears the redo stack; returns the new State, or None if the move is blocked."""
+        d = DIRECTIONS.index(tuple(direction)); neighbours = self.layout._neighbours
+        step = neighbours[self.state.player][d]
+        if step < 0: return None
+        pushed = self.state.boxes >> step & 1
+        if pushed and (neighbours[step][d] < 0 or self.state.boxes >> neighbours[step][d] & 1): return None
+        self._advance(d << 1 | pushed); del self.redo_deltas[:]
+        return self.state
+
+    def undo(self) -> Optional[State]:
+        if not self.deltas: return None
+        if len(self.deltas) % self.CHECKPOINT_INTERVAL == 0: self.checkpoints.pop()
+        delta = self.deltas.pop(); self.redo_deltas.append(delta)
+        d = delta >> 1; player, boxes = self.state; neighbours, is_target = self.layout._neighbours, self.layout._is_target
+        if delta & 1:
+            box = neighbours[player][d]; boxes ^= (1 << player) | (1 << box)
+            self.on_targets += is_target[player] - is_target[box]
+        self.state = State(neighbours[player][d ^ 1], boxes)
+        return self.state
+
+    def redo(self) -> Optional[State]:
+        if not self.redo_deltas: return None
+        self._advance(self.redo_deltas.pop())
+        return self.state
+
+    @property
+    def is_solved(self) -> bool:
+        return self.box_count > 0 and self.on_targets == self.box_count
+
+    def to_lurd(self) -> str:
+        """The moves played so far as a LURD string, with pushes in uppercase."""
+        return ''.join(LURD_LETTERS[delta >> 1].upper() if delta & 1 else LURD_LETTERS[delta >> 1] for delta in self.deltas)
+
+    @property
+    def last_direction(self) -> Optional[Tuple[int, int]]:
+        return DIRECTIONS[self.deltas[-1] >> 1] if self.deltas else None
+
+    def state_at(self, index: int) -> State:
+        """State after the first index moves (0 is the start), replayed from the nearest checkpoint."""
+        checkpoint = index // self.CHECKPOINT_INTERVAL; state = self.checkpoints[checkpoint]
+        for i in range(checkpoint * self.CHECKPOINT_INTERVAL, index): state = self._replay(state, self.deltas[i])
+        return state
+
+class ZobristKeys:
+    """Random per-cell keys for boxes and the player, for Zobrist hashing of dynamic states.
+
+    A state's hash is the XOR of the player key of its cell and the box keys of every box, so
+    a step updates it with two XORs and a push with four. Keys come from a fixed seed, so
+    hashes agree across processes; equal hashes must still be confirmed on the packed state.
+    """
+    SEED = 0x50C0BA4
+
+    def __init__(self, size: int):
+        rng = np.random.default_rng(self.SEED)
+        high = np.iinfo(np.int64).max
+        self.box: List[int] = rng.integers(1, high, size, dtype=np.int64).tolist()
+        self.player: List[int] = rng.integers(1, high, size, dtype=np.int64).tolist()
+
+    def hash(self, player: int, boxes: int) -> int:
+        """Hashes a state from scratch; moves should update a known hash with step/push instead."""
+        h = self.player[player]
+        for cell in mask_to_cells(boxes): h ^= self.box[cell]
+        return h
+
+    def step(self, h: int, player: int, to: int) -> int:
+        return h ^ self.player[player] ^ self.player[to]
+
+    def push(self, h: int, player: int, box: int, dest: int) -> int:
+        """Hash after the player on player pushes the box on box onto dest."""
+        return h ^ self.player[player] ^ self.player[box] ^ self.box[box] ^ self.box[dest]
+
+    def update(self, h: int, player: int, boxes: int, next_player: int, next_boxes: int) -> int:
+        """Hash after any single move, step, push or pull, between two known states."""
+        h ^= self.player[player] ^ self.player[next_player]
+        moved = boxes ^ next_boxes
+        if moved:
+            low = moved & -moved
+            h ^= self.box[low.bit_length() - 1] ^ self.box[(moved ^ low).bit_length() - 1]
+        return h
+
+def cells_to_mask(cells) -> int:
+    """Packs flat cell indices into a bitmask int."""
+    mask = 0
+    for cell in cells: mask |= 1 << int(cell)
+    return mask
+
+def mask_to_cells(mask: int) -> list:
+    """Unpacks a bitmask int into its sorted flat cell indices."""
+    cells = []
+    while mask:
+        low = mask & -mask; cells.append(low.bit_length() - 1); mask ^= low
+    return cells
\ No newline at end of file
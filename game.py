@@ -3,17 +3,22 @@
 from typing import Dict, Tuple, List, Optional
 import numpy as np
 import time
+from array import array
 from pathlib import Path
 import json
 from datetime import datetime
 import os
-import re
 
 from constants import GameObject
-from save_load import save_data, load_data
+from async_io import run_io
+from save_load import JournaledFile, save_level, load_level
 from assets import AssetManager
-from solver import bfs_solver
-from core import get_initial_board, get_targets_mask, is_win, move
+from solver import solve, SolverStats
+from core import get_initial_board, get_level_hash, LevelLayout, MoveHistory, State
+from solver_jobs import SolverJob
+from solution_cache import SolutionCache
+from level_index import LevelIndex
+from level_registry import LevelRegistry
 
 INITIAL_LEVELS = [
     [[0, 0, -1, -1, -1, 0], [0, 0, -1, 1, -1, 0], [0, 0, -1, 0, -1, -1], [-1, -1, -1, 2, 0, -1], [-1, 1, 0, 2, 3, -1], [-1, -1, -1, -1, -1, -1]],
@@ -32,97 +37,291 @@ INITIAL_LEVELS = [
     [[-1, -1, -1, -1, -1, -1, 0, 0], [-1, 1, 0, 0, 1, -1, -1, 0], [-1, 0, -1, 0, 0, 0, -1, 0], [-1, 0, 0, 0, 3, 2, -1, -1], [-1, -1, -1, -1, 0, 2, 0, -1], [0, 0, 0, -1, 0, 0, 0, -1], [0, 0, 0, -1, -1, -1, -1, -1]],
     [[-1, -1, -1, -1, -1, -1, -1, -1], [-1, 0, 0, -1, 1, 0, 0, -1], [-1, 3, 2, 1, 0, 0, 0, -1], [-1, 0, 0, 2, -1, 0, -1, -1], [-1, -1, -1, 0, 0, 0, -1, 0], [0, 0, -1, -1, -1, -1, -1, 0]]
 ]
-BASE_LEVELS: List[dict] = []
-CUSTOM_LEVELS: List[dict] = []
-ALL_SOLUTIONS: Dict[str, Optional[list]] = {}
+LEVELS = LevelRegistry()
+BASE_LEVELS: List[dict] = LEVELS.view('main')
+CUSTOM_LEVELS: List[dict] = LEVELS.view('custom')
+ALL_SOLUTIONS: Dict[str, Optional[list]] = {} # By level hash, so duplicate levels share one entry.
 LEVEL_STARS: Dict[str, Dict] = {}
 CURRENT_PLAYER_NAME = "Player"
 CUSTOM_LEVELS_DIR = Path("custom_levels")
 SAVE_FILE = "sokoban_save.json"
+SAVE_STORE: Optional[JournaledFile] = None
+SOLUTIONS_FILE = "sokoban_solutions.json"
+SOLUTION_CACHE: Optional[SolutionCache] = None
+LEVEL_INDEX_FILE = "custom_levels_index.json"
+LEVEL_INDEX: Optional[LevelIndex] = None
+GRADING_JOBS: List[Tuple[SolverJob, str, str, int, str]] = [] # (job, level key, player, win moves, win LURD)
 
-def get_or_compute_solution(level_key: str) -> Optional[List[Tuple[int, int]]]:
-    """Retrieves a solution from cache or computes it on-demand."""
-    if level_key in ALL_SOLUTIONS:
-        return ALL_SOLUTIONS[level_key]
+def _find_level(level_key: str) -> Optional[dict]:
+    return LEVELS.get(level_key)
+
+def get_level_data(level_info: dict) -> Optional[list]:
+    """A level's grid; custom levels are indexed without it and read on first use."""
+    if 'data' not in level_info: level_info['data'] = load_level(CUSTOM_LEVELS_DIR / level_info['key'])
+    return level_info['data']
+
+async def open_level(level_info: dict) -> Optional[list]:
+    """get_level_data for the game loop: a custom level's file is read on the I/O thread.
+    Returns None for a level that can't be played, e.g. a hand-edited file with no player."""
+    if 'data' not in level_info: level_info['data'] = await run_io(load_level, CUSTOM_LEVELS_DIR / level_info['key'])
+    level_data = level_info['data']
+    if level_data and not any(GameObject.PLAYER.value in row for row in level_data):
+        print(f"!! ERROR: Level {level_info['key']} has no player"); return None
+    return level_data
+
+def _custom_level_info(filename: str, entry: dict, number: int) -> dict:
+    return {'key': filename, 'name': f"#{number} by {entry['creator']}", 'creator': entry['creator'],
+            'hash': entry['hash'], 'symmetric_hash': entry['symmetric_hash'], 'width': entry['width'], 'height': entry['height']}
+
+def _renumber_custom_levels(creator: str):
+    for number, level_info in enumerate((lvl for lvl in CUSTOM_LEVELS if lvl['creator'] == creator), 1):
+        level_info['name'] = f"#{number} by {creator}"
+
+def _base_level_info(index: int, grid: list) -> dict:
+    board = get_initial_board(grid)
+    return {'key': f'base_{index}', 'name': f'Level {index + 1}', 'data': grid,
+            'hash': get_level_hash(board), 'symmetric_hash': get_level_hash(board, symmetric=True)}
+
+def find_duplicate_level(level_data: list) -> Optional[dict]:
+    """A known level with the same layout as level_data, allowing for padding, rotation and reflection."""
+    level_hash = get_level_hash(get_initial_board(level_data), symmetric=True)
+    return next((lvl for lvl in LEVELS.levels.values() if lvl['symmetric_hash'] == level_hash), None)
+
+def get_cached_solution(level_key: str) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
+    """Returns (found, solution) from memory or the on-disk cache, without solving."""
+    level_info = _find_level(level_key)
+    if not level_info:
+        return False, None
+    return _cached_solution(level_info['hash'])
+
+def _cached_solution(level_hash: str) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
+    if level_hash in ALL_SOLUTIONS:
+        return True, ALL_SOLUTIONS[level_hash]
+    found, solution = SOLUTION_CACHE.get(level_hash)
+    if found: ALL_SOLUTIONS[level_hash] = solution
+    return found, solution
+
+def get_board_solution(board: np.ndarray) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
+    """get_cached_solution for a board that is not a level yet, e.g. in the editor."""
+    return _cached_solution(get_level_hash(board))
+
+def record_solution(level_hash: str, solution: Optional[List[Tuple[int, int]]], exhausted: bool = False, **stats):
+    """Caches a solve result in memory and on disk by level hash; a search that ran out of budget proves nothing and is dropped."""
+    if exhausted: return
+    ALL_SOLUTIONS[level_hash] = solution # Cache the result, even if it's None
+    SOLUTION_CACHE.put(level_hash, solution, **stats)
+
+def store_solution(level_key: str, solution: Optional[List[Tuple[int, int]]], exhausted: bool = False, **stats):
+    """record_solution for a known level, logged; saved wins on it are graded against the result."""
+    if exhausted: print(f"  - {level_key}: gave up after {stats.get('expanded', 0):,} nodes"); return
+    level_info = _find_level(level_key)
+    if level_info:
+        record_solution(level_info['hash'], solution, **stats)
+        grade_saved_wins(level_key)
+    status = "SOLVABLE" if solution else "UNSOLVABLE"
+    print(f"  - {level_key}: {status} (len: {len(solution) if solution else 'N/A'})")
+
+def get_or_compute_solution(level_key: str, algorithm: str = 'astar') -> Optional[List[Tuple[int, int]]]:
+    """Retrieves a solution from cache or computes it on-demand with the given solver algorithm."""
+    found, solution = get_cached_solution(level_key)
+    if found:
+        return solution
 
     print(f"Computing solution for {level_key}...")
-    all_levels = BASE_LEVELS + CUSTOM_LEVELS
-    level_info = next((lvl for lvl in all_levels if lvl['key'] == level_key), None)
+    level_info = _find_level(level_key)
     
     if not level_info:
         print(f"!! ERROR: Could not find level data for key {level_key}")
         return None
         
-    board = get_initial_board(level_info['data'])
-    solution = bfs_solver(board)
-    ALL_SOLUTIONS[level_key] = solution # Cache the result, even if it's None
-    
-    status = "SOLVABLE" if solution else "UNSOLVABLE"
-    print(f"  - {level_key}: {status} (len: {len(solution) if solution else 'N/A'})")
-    
+    board = get_initial_board(get_level_data(level_info))
+    stats = SolverStats(); start = time.time()
+    solution = solve(board, algorithm, stats=stats)
+    store_solution(level_key, solution, stats.exhausted, algorithm=algorithm, expanded=stats.expanded, seconds=round(time.time() - start, 3))
     return solution
 
+def start_solution_job(level_key: str, algorithm: str = 'astar') -> Optional[SolverJob]:
+    """Starts solving a level in the background; returns None if the level is unknown."""
+    level_info = _find_level(level_key)
+    if not level_info:
+        print(f"!! ERROR: Could not find level data for key {level_key}")
+        return None
+    print(f"Computing solution for {level_key} in the background...")
+    return SolverJob(get_initial_board(get_level_data(level_info)), algorithm)
+
 class GameState:
     def __init__(self,level_key:str,level_data:list,assets:AssetManager):
         self.assets=assets; self.level_key=level_key
-        self.initial_board=get_initial_board(level_data); self.target_mask=get_targets_mask(self.initial_board)
-        self.move_stack:List[np.ndarray]=[self.initial_board.copy()]; self.redo_stack:List[np.ndarray]=[]
+        # Static layer once per level; positions are compact States (player cell + box bitmask).
+        self.initial_board=get_initial_board(level_data); self.layout=LevelLayout(self.initial_board)
+        self.initial_state=self.layout.initial_state(self.initial_board)
+        if self.initial_state is None: raise ValueError(f"Level {level_key} has no player")
+        self.history=MoveHistory(self.layout,self.initial_state)
         self.start_time=time.time(); self.win_time:Optional[float]=None; self.is_won=False
         self.auto_play=False; self.auto_play_idx=0; self.auto_play_speed=0.1; self.player_direction:Tuple[int,int]=(1,0)
         self.solution: Optional[List[Tuple[int,int]]] = None
+        self.solver_job: Optional[SolverJob] = None; self.autoplay_requested = False; self.win_moves = 0; self.win_lurd = ''
+        self.zobrist = self.layout.zobrist; self._reset_positions()
         
     @property
-    def current_board(self)->np.ndarray:return self.move_stack[-1]
+    def current_state(self)->State:return self.history.state
+
+    @property
+    def current_board(self)->np.ndarray:
+        """The current position as a full grid; renderers and the game loop use current_state."""
+        return self.layout.to_board(self.current_state)
+
+    @property
+    def position_hash(self)->int:return self.hash_stack[-1]
+
+    @property
+    def is_repeated_position(self)->bool:
+        """True if the current position already occurred earlier in this attempt."""
+        if self.position_counts.get(self.position_hash, 0) < 2: return False
+        # Equal hashes are confirmed on the states themselves, so a collision is never reported.
+        return any(self.hash_stack[i] == self.position_hash and self.history.state_at(i) == self.current_state for i in range(len(self.hash_stack) - 1))
+
+    def _reset_positions(self):
+        h = self.zobrist.hash(*self.initial_state)
+        self.hash_stack = array('q', [h]); self.position_counts: Dict[int, int] = {h: 1}
+
+    def _push_position(self, previous: State):
+        """Records the Zobrist hash of the move just played from previous, updated with XORs only."""
+        h = self.zobrist.update(self.position_hash, *previous, *self.current_state)
+        self.hash_stack.append(h); self.position_counts[h] = self.position_counts.get(h, 0) + 1
+
+    def _pop_position(self):
+        h = self.hash_stack.pop(); self.position_counts[h] -= 1
     
     def perform_move(self,direction:Tuple[int,int])->bool:
         if self.is_won or self.auto_play:return False
-        new_board=move(self.current_board,direction,self.target_mask)
-        if new_board is not None:
-            self.player_direction=direction
-            if np.count_nonzero((self.current_board==GameObject.BOX.value)&self.target_mask)<np.count_nonzero((new_board==GameObject.BOX.value)&self.target_mask):self.assets.sounds['place_box'].play()
+        previous=self.current_state;placed=self.history.on_targets
+        if self.history.push(direction) is not None:
+            self.player_direction=direction;self._push_position(previous)
+            if self.history.on_targets>placed:self.assets.sounds['place_box'].play()
             else:self.assets.sounds['move'].play()
-            self.move_stack.append(new_board);self.redo_stack.clear();self.check_win();return True
+            self.check_win();return True
         return False
         
     def undo(self):
-        if len(self.move_stack)>1 and not self.auto_play:self.assets.sounds['undo'].play();self.redo_stack.append(self.move_stack.pop())
+        if len(self.history)>0 and not self.auto_play:self.assets.sounds['undo'].play();self.history.undo();self._pop_position()
+
+    def redo(self):
+        if self.history.redo_deltas and not self.is_won and not self.auto_play:
+            previous=self.current_state;self.history.redo();self._push_position(previous)
+            self.player_direction=self.history.last_direction;self.assets.sounds['move'].play();self.check_win()
         
     def restart(self):
-        self.move_stack=[self.initial_board.copy()];self.redo_stack=[];self.start_time=time.time();self.is_won=False;self.win_time=None;self.auto_play=False;self.player_direction=(1,0)
+        self._hand_off_grading();self.history.reset();self._reset_positions();self.start_time=time.time();self.is_won=False;self.win_time=None;self.auto_play=False;self.player_direction=(1,0)
         
     def start_solver(self):
-        self.solution = get_or_compute_solution(self.level_key)
+        found, solution = get_cached_solution(self.level_key)
+        if found:
+            self._begin_autoplay(solution); return
+        self.autoplay_requested = True
+        if self.solver_job is None: self.solver_job = start_solution_job(self.level_key)
+
+    def _begin_autoplay(self, solution: Optional[List[Tuple[int,int]]]):
+        self.solution = solution
         if self.solution:
             self.restart()
             self.auto_play=True
             self.auto_play_idx=0
+
+    def poll_solver(self):
+        """Collects a finished background solve: caches it, then grades a pending win or starts autoplay."""
+        if self.solver_job is None or not self.solver_job.poll(): return
+        job = self.solver_job; self.solver_job = None
+        if job.cancelled or job.failed: return
+        store_solution(self.level_key, job.solution, **job.stats())
+        if self.is_won: self._record_stars(job.solution)
+        elif self.autoplay_requested: self._begin_autoplay(job.solution)
+        self.autoplay_requested = False
+
+    def cancel_solver(self):
+        """Stops a running hint solve, e.g. on Esc or when leaving the level; one grading a win keeps running."""
+        self._hand_off_grading()
+        if self.solver_job is not None: self.solver_job.cancel(); self.solver_job = None
+        self.autoplay_requested = False
+
+    def _hand_off_grading(self):
+        """Moves a solve that still has to grade this win to GRADING_JOBS, which outlives the level."""
+        if self.solver_job is not None and self.is_won:
+            GRADING_JOBS.append((self.solver_job, self.level_key, CURRENT_PLAYER_NAME, self.win_moves, self.win_lurd)); self.solver_job = None
             
     def step_solver(self):
         if self.auto_play and self.solution and self.auto_play_idx < len(self.solution):
-            direction=self.solution[self.auto_play_idx];self.player_direction=direction;new_board=move(self.current_board,direction,self.target_mask)
-            if new_board is not None:self.move_stack.append(new_board)
+            direction=self.solution[self.auto_play_idx];self.player_direction=direction;previous=self.current_state
+            if self.history.push(direction) is not None:self._push_position(previous)
             self.auto_play_idx+=1;self.check_win()
         else:self.auto_play=False
         
     def check_win(self):
-        global LEVEL_STARS
-        if not self.is_won and is_win(self.current_board,self.target_mask):
+        if not self.is_won and self.history.is_solved:
             self.is_won=True;self.win_time=time.time();self.auto_play=False;self.assets.sounds['win'].play()
-            
-            solution = get_or_compute_solution(self.level_key)
-            moves=len(self.move_stack)-1;optimal_moves=len(solution) if solution else float('inf')
-            
-            stars=1
-            if moves<=optimal_moves*1.5:stars=2
-            if moves<=optimal_moves:stars=3
-            
-            player_data = LEVEL_STARS.setdefault(CURRENT_PLAYER_NAME, {'scores': {}, 'last_played': ''})
-            player_scores = player_data.get('scores', {})
-            player_scores[self.level_key] = max(player_scores.get(self.level_key, 0), stars)
-            player_data['scores'] = player_scores
-            player_data['last_played'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-            
-            save_data(LEVEL_STARS,Path(SAVE_FILE))
+            self.win_moves=len(self.history);self.win_lurd=self.history.to_lurd()
+            found, solution = get_cached_solution(self.level_key)
+            if found: self._record_stars(solution)
+            else:
+                # Bank one star now; poll_solver upgrades it once the optimal length is known.
+                self._record_stars(None, provisional=True)
+                if self.solver_job is None: self.solver_job = start_solution_job(self.level_key)
+
+    def _record_stars(self, solution: Optional[List[Tuple[int,int]]], provisional: bool = False):
+        record_win(CURRENT_PLAYER_NAME, self.level_key, self.win_moves, self.win_lurd, solution, provisional)
+
+def record_win(player_name: str, level_key: str, win_moves: int, win_lurd: str, solution: Optional[List[Tuple[int,int]]], provisional: bool = False):
+    stars=1 if provisional else rate_solution(win_moves,len(solution) if solution else None)
+    
+    player_data = LEVEL_STARS.setdefault(player_name, {'scores': {}, 'last_played': ''})
+    player_scores = player_data.get('scores', {})
+    player_scores[level_key] = max(player_scores.get(level_key, 0), stars)
+    player_data['scores'] = player_scores
+    # Keep the shortest winning run as LURD so verify_solutions.py can re-check the score.
+    player_solutions = player_data.setdefault('solutions', {})
+    best = player_solutions.get(level_key)
+    if best is None or len(win_lurd) < len(best): player_solutions[level_key] = win_lurd
+    player_data['last_played'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    
+    save_progress()
+
+def poll_grading_jobs():
+    """Grades wins whose solve finished after the player left the level."""
+    for entry in list(GRADING_JOBS):
+        job, level_key, player_name, win_moves, win_lurd = entry
+        if not job.poll(): continue
+        GRADING_JOBS.remove(entry)
+        if job.cancelled or job.failed: continue
+        store_solution(level_key, job.solution, **job.stats())
+        record_win(player_name, level_key, win_moves, win_lurd, job.solution)
+
+def cancel_grading_jobs():
+    """Stops unfinished grading solves at exit; grade_saved_wins scores those wins once the level is solved."""
+    for job, *_ in GRADING_JOBS: job.cancel()
+    GRADING_JOBS.clear()
+
+def grade_saved_wins(level_key: Optional[str] = None):
+    """Upgrades stars from each player's saved shortest run on levels whose optimal length is cached."""
+    changed = False
+    for player_data in LEVEL_STARS.values():
+        scores = player_data.setdefault('scores', {})
+        for key, lurd in player_data.get('solutions', {}).items():
+            if level_key is not None and key != level_key: continue
+            found, solution = get_cached_solution(key)
+            if not found: continue
+            stars = rate_solution(len(lurd), len(solution) if solution else None)
+            if stars > scores.get(key, 0): scores[key] = stars; changed = True
+    if changed: save_progress()
+
+def save_progress():
+    """Persists LEVEL_STARS; only changed players are journaled, and bursts are coalesced."""
+    SAVE_STORE.save(LEVEL_STARS)
+
+def rate_solution(moves: int, optimal_moves: Optional[int]) -> int:
+    """Stars for a win: 3 at the optimal length, 2 within 1.5x of it, 1 otherwise or if unknown."""
+    if optimal_moves is None: return 1
+    if moves <= optimal_moves: return 3
+    return 2 if moves <= optimal_moves * 1.5 else 1
 
 def get_stars_for_player(player_name: str) -> Dict[str, int]:
     return LEVEL_STARS.get(player_name, {}).get('scores', {})
@@ -146,26 +345,38 @@ def _migrate_save_data(data: dict) -> dict:
             }
             migrated = True
     if migrated:
-        save_data(data, Path(SAVE_FILE))
+        SAVE_STORE.save(data)
     return data
 
+def _read_game_files() -> tuple:
+    """The file reads behind initialize_game_data; safe to run on the I/O thread."""
+    CUSTOM_LEVELS_DIR.mkdir(exist_ok=True)
+    # Only new or modified files are parsed; grids of unchanged ones load on demand via get_level_data.
+    level_index = LevelIndex(CUSTOM_LEVELS_DIR, Path(LEVEL_INDEX_FILE))
+    custom_entries = level_index.refresh()
+    save_store = SAVE_STORE or JournaledFile(Path(SAVE_FILE))
+    saved_progress = save_store.load()
+    solution_cache = SOLUTION_CACHE or SolutionCache(Path(SOLUTIONS_FILE))
+    return level_index, custom_entries, save_store, saved_progress, solution_cache
+
 def initialize_game_data():
-    global BASE_LEVELS,CUSTOM_LEVELS,ALL_SOLUTIONS,LEVEL_STARS,CURRENT_PLAYER_NAME
-    BASE_LEVELS=[{'key':f'base_{i}','name':f'Level {i+1}','data':lvl} for i,lvl in enumerate(INITIAL_LEVELS)]
-    CUSTOM_LEVELS_DIR.mkdir(exist_ok=True);CUSTOM_LEVELS=[]
-    
-    creator_counts = {}
-    sorted_files = sorted(CUSTOM_LEVELS_DIR.glob("*.json"), key=os.path.getmtime)
-
-    for file_path in sorted_files:
-        try:
-            level_data=load_data(file_path);creator=file_path.stem.split('_')[0]
-            creator_counts[creator] = creator_counts.get(creator, 0) + 1
-            player_level_count = creator_counts[creator]
-            CUSTOM_LEVELS.append({'key':file_path.name,'name':f'#{player_level_count} by {creator}','data':level_data,'creator':creator})
-        except Exception as e:print(f"Error loading custom level {file_path}: {e}")
+    _apply_game_data(*_read_game_files())
+
+async def load_game_data():
+    """initialize_game_data for the game loop: files are read on the I/O thread, globals set here."""
+    _apply_game_data(*await run_io(_read_game_files))
+
+def _apply_game_data(level_index, custom_entries, save_store, saved_progress, solution_cache):
+    global ALL_SOLUTIONS,LEVEL_STARS,CURRENT_PLAYER_NAME,SOLUTION_CACHE,LEVEL_INDEX,SAVE_STORE
+    LEVELS.set_view('main',(_base_level_info(i,lvl) for i,lvl in enumerate(INITIAL_LEVELS)))
+    LEVEL_INDEX = level_index
+    creator_counts = {}; custom_levels = []
+    for filename, entry in custom_entries:
+        creator_counts[entry['creator']] = creator_counts.get(entry['creator'], 0) + 1
+        custom_levels.append(_custom_level_info(filename, entry, creator_counts[entry['creator']]))
+    LEVELS.set_view('custom', custom_levels)
     
-    saved_progress=load_data(Path(SAVE_FILE))
+    SAVE_STORE = save_store
     if saved_progress and isinstance(saved_progress,dict):
         LEVEL_STARS = _migrate_save_data(saved_progress)
         player_list=list(LEVEL_STARS.keys())
@@ -173,37 +384,48 @@ def initialize_game_data():
     else:LEVEL_STARS={}
     
     ALL_SOLUTIONS.clear()
-    print("Game initialized without pre-computing solutions.")
+    SOLUTION_CACHE = solution_cache
+    grade_saved_wins() # Wins left ungraded when the game last quit.
+    print(f"Game initialized with {len(SOLUTION_CACHE.entries)} cached solutions.")
+
+def _write_custom_level(level_data:list,creator:str)->Tuple[str,Optional[dict],int]:
+    filename=f"{creator}_{LEVEL_INDEX.next_number(creator)}.xsb";save_path=CUSTOM_LEVELS_DIR/filename
+    save_level(level_data,save_path);print(f"New custom level saved to {save_path}")
+    entry=LEVEL_INDEX.add(save_path)
+    return filename,entry,LEVEL_INDEX.creator_counts.get(entry['creator'],0) if entry else 0
 
-def save_custom_level(level_data:list):
-    player_levels=list(CUSTOM_LEVELS_DIR.glob(f"{CURRENT_PLAYER_NAME}_*.json"))
-    level_numbers=[int(re.search(r'_(\d+)\.json$',f.name).group(1)) for f in player_levels if re.search(r'_(\d+)\.json$',f.name)]
-    next_level_num=max(level_numbers)+1 if level_numbers else 1
-    filename=f"{CURRENT_PLAYER_NAME}_{next_level_num}.json";save_path=CUSTOM_LEVELS_DIR/filename
-    save_data(level_data,save_path);print(f"New custom level saved to {save_path}")
+async def save_custom_level(level_data:list):
+    filename,entry,number=await run_io(_write_custom_level,level_data,CURRENT_PLAYER_NAME)
+    if entry:
+        LEVELS.add('custom',_custom_level_info(filename,entry,number))
 
     player_data = LEVEL_STARS.setdefault(CURRENT_PLAYER_NAME, {'scores': {}, 'last_played': ''})
     player_data['last_played'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    save_data(LEVEL_STARS, Path(SAVE_FILE))
+    save_progress()
 
-    initialize_game_data()
+def _remove_custom_level_file(level_key:str)->bool:
+    file_path=CUSTOM_LEVELS_DIR/level_key
+    if not file_path.exists(): return False
+    os.remove(file_path);print(f"Deleted custom level: {file_path}")
+    LEVEL_INDEX.remove(level_key)
+    return True
 
-def delete_custom_level(level_key:str):
+async def delete_custom_level(level_key:str):
     try:
-        file_path=CUSTOM_LEVELS_DIR/level_key
-        if file_path.exists():
-            os.remove(file_path);print(f"Deleted custom level: {file_path}")
+        if await run_io(_remove_custom_level_file,level_key):
+            level_info=_find_level(level_key)
             for player in LEVEL_STARS:
                 if level_key in LEVEL_STARS[player].get('scores', {}):
                     del LEVEL_STARS[player]['scores'][level_key]
-            save_data(LEVEL_STARS,Path(SAVE_FILE));initialize_game_data()
+                LEVEL_STARS[player].get('solutions', {}).pop(level_key, None)
+            save_progress()
+            if level_info:
+                LEVELS.remove(level_key);_renumber_custom_levels(level_info['creator'])
+                # Keep the cached solution if another level shares the same grid.
+                if all(lvl['hash']!=level_info['hash'] for lvl in LEVELS.levels.values()):
+                    SOLUTION_CACHE.evict(level_info['hash']);ALL_SOLUTIONS.pop(level_info['hash'],None)
             return True
     except Exception as e:print(f"Error deleting level {level_key}: {e}")
     return False
 
-def solve_new_level(level_data:list):
-    print("Checking level solvability...");board=get_initial_board(level_data)
-    solution=bfs_solver(board)
-    status="SOLVABLE"if solution else"UNSOLVABLE";print(f"Level Check:{status}(len:{len(solution)if solution else'N/A'})")
-    return solution is not None
 # --- END OF FINAL UPGRADED FILE game.py ---
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from save_load import JournaledFile, load_level, LEVEL_SUFFIXES
+from core import get_initial_board, get_level_hash
+
+class LevelIndex:
+    """Manifest of a directory of level files, so startup only parses files that changed.
+
+    Each entry, keyed by file name, holds the file's mtime and size (to spot edits) plus the
+    level's content hashes (exact, and up to rotation/reflection), creator and dimensions.
+    refresh() re-reads only new or modified files; add() and remove() journal a single entry
+    after the game writes or deletes a level, and the manifest is only rewritten on compaction.
+    Per-creator level counts and highest file numbers are kept alongside, so naming and
+    numbering a new level does not scan the index. It does blocking file I/O throughout, so the
+    game only uses it from the I/O thread.
+    """
+    VERSION = 3
+    NUMBER_PATTERN = re.compile(r'_(\d+)\.(?:xsb|json)$')
+
+    def __init__(self, directory: Path, manifest_path: Path):
+        self.directory = directory; self.store = JournaledFile(manifest_path)
+        self.creator_counts: Dict[str, int] = {}; self.last_numbers: Dict[str, int] = {}
+        self.entries: Dict[str, dict] = {}
+        for name, entry in self._load().items(): self._track(name, entry, 1)
+
+    def _load(self) -> Dict[str, dict]:
+        data = self.store.load()
+        if not isinstance(data, dict) or data.get('version') != self.VERSION: return {}
+        return {name: entry for name, entry in data.items() if name != 'version'}
+
+    def _track(self, name: str, entry: Optional[dict], delta: int):
+        """Adds (delta 1) or drops (delta -1) an entry and keeps the per-creator counters in step."""
+        if entry is None: return
+        if delta > 0: self.entries[name] = entry
+        else: self.entries.pop(name, None)
+        creator = entry['creator']; self.creator_counts[creator] = self.creator_counts.get(creator, 0) + delta
+        match = self.NUMBER_PATTERN.search(name) # Numbered by file prefix, which is the full player name.
+        if match and delta > 0:
+            prefix = name[:match.start()]; self.last_numbers[prefix] = max(self.last_numbers.get(prefix, 0), int(match.group(1)))
+
+    def next_number(self, creator: str) -> int:
+        """The file number for the creator's next level, one past the highest indexed so far."""
+        return self.last_numbers.get(creator, 0) + 1
+
+    def _index_file(self, path: Path, stat: os.stat_result) -> Optional[dict]:
+        level_data = load_level(path)
+        if not isinstance(level_data, list) or not level_data:
+            print(f"Error loading custom level {path}: not a level grid"); return None
+        board = get_initial_board(level_data)
+        return {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': get_level_hash(board),
+                'symmetric_hash': get_level_hash(board, symmetric=True),
+                'creator': path.stem.split('_')[0], 'height': board.shape[0], 'width': board.shape[1]}
+
+    def refresh(self) -> List[Tuple[str, dict]]:
+        """Syncs the manifest with the directory and returns its entries, oldest file first."""
+        entries = {}; changed = False
+        with os.scandir(self.directory) as files:
+            for file in files:
+                if not file.name.endswith(LEVEL_SUFFIXES) or not file.is_file(): continue
+                stat = file.stat(); entry = self.entries.get(file.name)
+                if entry is None or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+                    entry = self._index_file(Path(file.path), stat); changed = True
+                if entry is not None: entries[file.name] = entry
+        changed = changed or len(entries) != len(self.entries)
+        if changed:
+            self.entries = {}; self.creator_counts = {}; self.last_numbers = {}
+            for name, entry in entries.items(): self._track(name, entry, 1)
+            self.store.save({'version': self.VERSION, **self.entries}); self.store.flush()
+        return self.ordered()
+
+    def ordered(self) -> List[Tuple[str, dict]]:
+        return sorted(self.entries.items(), key=lambda item: (item[1]['mtime'], item[0]))
+
+    def add(self, path: Path) -> Optional[dict]:
+        """Indexes one new or rewritten level file and journals its entry."""
+        entry = self._index_file(path, path.stat())
+        if entry is not None:
+            self._track(path.name, self.entries.get(path.name), -1); self._track(path.name, entry, 1)
+            self.store.set(path.name, entry); self.store.flush()
+        return entry
+
+    def remove(self, name: str):
+        entry = self.entries.get(name)
+        if entry is not None:
+            self._track(name, entry, -1); self.store.set(name, None); self.store.flush()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class LevelRegistry:
+    """Every playable level by key, plus an ordered list of levels per mode ('main', 'custom').
+
+    A level dict is shared by the key index and its mode's list and records its 'mode' and its
+    'index' in that list, so lookups and prev/next navigation are O(1). Only remove() shifts the
+    indices of the levels after the removed one.
+    """
+    def __init__(self):
+        self.levels: Dict[str, dict] = {}
+        self.views: Dict[str, List[dict]] = {}
+
+    def __contains__(self, level_key: str) -> bool:
+        return level_key in self.levels
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def get(self, level_key: str) -> Optional[dict]:
+        return self.levels.get(level_key)
+
+    def view(self, mode: str) -> List[dict]:
+        """The ordered levels of a mode; the list object stays the same across set_view calls."""
+        return self.views.setdefault(mode, [])
+
+    def set_view(self, mode: str, levels: Iterable[dict]) -> List[dict]:
+        view = self.view(mode)
+        for level_info in view: self.levels.pop(level_info['key'], None)
+        view.clear()
+        for level_info in levels: self.add(mode, level_info)
+        return view
+
+    def add(self, mode: str, level_info: dict) -> dict:
+        """Appends a level to the end of its mode's list."""
+        view = self.view(mode)
+        level_info.update(mode=mode, index=len(view)); view.append(level_info); self.levels[level_info['key']] = level_info
+        return level_info
+
+    def remove(self, level_key: str) -> Optional[dict]:
+        level_info = self.levels.pop(level_key, None)
+        if level_info is None: return None
+        view = self.views[level_info['mode']]; del view[level_info['index']]
+        for i in range(level_info['index'], len(view)): view[i]['index'] = i
+        return level_info
+
+    def neighbours(self, level_key: str) -> Tuple[Optional[dict], Optional[dict]]:
+        """The previous and next levels of the same mode, None at either end."""
+        level_info = self.levels.get(level_key)
+        if level_info is None: return None, None
+        view = self.views[level_info['mode']]; i = level_info['index']
+        return view[i - 1] if i > 0 else None, view[i + 1] if i + 1 < len(view) else None
\ No newline at end of file
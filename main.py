@@ -8,6 +8,7 @@ import platform
 from config import GameConfig, DEFAULT_THEME
 from assets import AssetManager
 import game
+import async_io
 from ui import show_splash_screen, show_main_menu, show_player_select_screen, show_mode_select, show_level_select, play_level, level_editor, show_high_scores
 
 async def main():
@@ -20,7 +21,8 @@ async def main():
     assets_path = Path(__file__).parent / "assets"
     assets = AssetManager(config, DEFAULT_THEME, assets_path)
     
-    game.initialize_game_data()
+    async_io.start()
+    await game.load_game_data()
     
     if pygame.mixer.get_init() and pygame.mixer.music.get_volume() > 0:
         pygame.mixer.music.play(-1, 0.0, 5000)
@@ -31,6 +33,8 @@ async def main():
     current_key = ''
     
     while game_state != "QUIT":
+        game.poll_grading_jobs() # Stars for wins whose solve finished after leaving the level.
+        game.SAVE_STORE.flush_if_due() # Writes progress held back by a burst of saves.
         if game_state == "SPLASH": game_state = await show_splash_screen(screen, assets)
         elif game_state == "MAIN_MENU": game_state = await show_main_menu(screen, assets)
         elif game_state == "PLAYER_SELECT": game_state = await show_player_select_screen(screen, assets)
@@ -67,6 +71,7 @@ async def main():
             config.TILE_SIZE = int(64 * min(event.w / config.WINDOW_WIDTH, event.h / config.WINDOW_HEIGHT))
             assets.images = assets.scale_images()
 
+    game.cancel_grading_jobs() # Don't hold the window open; saved runs are graded on a later solve.
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,16 +1,38 @@
 from pathlib import Path
+import atexit
+import hashlib
 import json
-from typing import Any
+import os
+import time
+from typing import Any, Dict, Optional, Set
 
-def save_data(data: Any, filename: Path):
-    """Save data to a JSON file."""
+from constants import GameObject
+from async_io import submit_io
+
+# XSB text: one character per cell, one line per row. '-' and '_' are accepted as floor on load.
+XSB_CHARS = {GameObject.WALL.value: '#', GameObject.EMPTY.value: ' ', GameObject.TARGET.value: '.',
+             GameObject.BOX.value: '$', GameObject.PLAYER.value: '@'}
+_XSB_CELLS = {**{c: v for v, c in XSB_CHARS.items()}, '-': GameObject.EMPTY.value, '_': GameObject.EMPTY.value}
+LEVEL_SUFFIXES = ('.xsb', '.json')
+
+def write_atomic(filename: Path, text: str):
+    """Writes text to a temporary file and renames it over filename, so a crash never leaves it truncated."""
+    temp = filename.with_name(filename.name + '.tmp')
+    with temp.open('w') as f:
+        f.write(text); f.flush(); os.fsync(f.fileno())
+    os.replace(temp, filename)
+
+def _write_text(filename: Path, text: str):
     try:
-        with filename.open('w') as f:
-            json.dump(data, f, indent=2)
+        write_atomic(filename, text)
         print(f"Data saved to {filename}.")
     except IOError as e:
         print(f"Could not save to {filename}: {e}")
 
+def write_json(data: Any, filename: Path):
+    """Saves data to a JSON file atomically, on the calling thread."""
+    _write_text(filename, json.dumps(data, indent=2))
+
 def load_data(filename: Path) -> Any:
     """Load data from a JSON file with validation."""
     if not filename.exists():
@@ -21,4 +43,143 @@ def load_data(filename: Path) -> Any:
             return data
     except (IOError, json.JSONDecodeError) as e:
         print(f"Could not load or parse {filename}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def encode_level(level_data: list) -> str:
+    """Encodes a level grid as XSB text. Trailing floor is kept so the grid round-trips exactly."""
+    return '\n'.join(''.join(XSB_CHARS[cell] for cell in row) for row in level_data) + '\n'
+
+def decode_level(text: str) -> list:
+    """Decodes XSB text into a level grid; raises ValueError on cells the game cannot represent."""
+    try:
+        return [[_XSB_CELLS[c] for c in line] for line in text.splitlines() if line]
+    except KeyError as e:
+        raise ValueError(f"Unsupported XSB cell {e.args[0]!r}") from None
+
+def save_level(level_data: list, filename: Path):
+    """Save a level grid as compact XSB text."""
+    try:
+        write_atomic(filename, encode_level(level_data))
+        print(f"Level saved to {filename}.")
+    except IOError as e:
+        print(f"Could not save to {filename}: {e}")
+
+def load_level(filename: Path) -> Optional[list]:
+    """Load a level grid from an .xsb file, or from a legacy .json one."""
+    if filename.suffix != '.xsb': return load_data(filename)
+    if not filename.exists():
+        return None
+    try:
+        return decode_level(filename.read_text())
+    except (IOError, ValueError) as e:
+        print(f"Could not load or parse {filename}: {e}")
+        return None
+
+class JournaledFile:
+    """A JSON dict stored as an atomic snapshot plus an append-only journal of per-key updates.
+
+    save(data) journals only the top-level entries that changed since the last write, so a win
+    appends one player's record instead of rewriting the whole file. Saves arriving within
+    COALESCE_SECONDS of the last write are held and written together by the next save or
+    flush_if_due() (and at exit); set(key, value) updates a single entry without rebuilding the
+    dict. Once the journal holds more records than both COMPACT_RECORDS and the entry count it
+    is folded into a new snapshot, which keeps the cost of compaction amortised per update.
+    The journal starts with the hash of the snapshot it extends, so one left over from a
+    compaction interrupted by a crash is ignored, as is a torn last record; the next flush then
+    compacts rather than appending after the partial line.
+    Records and snapshots are built on the caller's thread and written on the I/O thread.
+    """
+    COALESCE_SECONDS = 0.5
+    COMPACT_RECORDS = 64
+
+    def __init__(self, filename: Path):
+        self.filename = filename; self.journal = filename.with_name(filename.name + '.journal')
+        self.written: Dict[str, str] = {}; self.latest: Dict[str, str] = {} # key -> JSON text
+        self.dirty: Set[str] = set() # Keys that may differ between latest and written.
+        self.snapshot_id = ''; self.records = 0; self.last_write = 0.0
+        self.torn = False # The journal ends in a partial record, so it must be rewritten, not appended to.
+        atexit.register(self.flush)
+
+    def load(self) -> Optional[dict]:
+        """The snapshot with its journal replayed over it, or None if neither exists."""
+        data = None
+        if self.filename.exists():
+            try:
+                text = self.filename.read_text(); self.snapshot_id = hashlib.sha1(text.encode()).hexdigest(); data = json.loads(text)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Could not load or parse {self.filename}: {e}")
+        if data is None and not self.journal.exists(): return None
+        if not isinstance(data, dict): data = {}
+        self.records = 0; self.torn = False
+        if self.journal.exists():
+            with self.journal.open('r') as f:
+                for number, line in enumerate(f):
+                    try: record = json.loads(line)
+                    except json.JSONDecodeError: record = None
+                    if not isinstance(record, dict) or (number and 'key' not in record):
+                        self.torn = True; break # Torn write from a crash; nothing follows it.
+                    if number == 0:
+                        if record.get('snapshot') != self.snapshot_id: break # Already folded into the snapshot.
+                        continue
+                    if record.get('value') is None: data.pop(record['key'], None)
+                    else: data[record['key']] = record['value']
+                    self.records += 1
+        self.written = {key: json.dumps(value) for key, value in data.items()}; self.latest = dict(self.written); self.dirty.clear()
+        return data
+
+    @property
+    def pending(self) -> bool:
+        return any(self.latest.get(key) != self.written.get(key) for key in self.dirty)
+
+    def save(self, data: dict):
+        latest = {key: json.dumps(value) for key, value in data.items()}
+        self.dirty.update(key for key, value in latest.items() if self.written.get(key) != value)
+        self.dirty.update(key for key in self.written if key not in latest); self.latest = latest
+        if time.time() - self.last_write >= self.COALESCE_SECONDS: self.flush()
+
+    def set(self, key: str, value: Any):
+        """Updates one top-level entry, or removes it if value is None; written by the next flush."""
+        if value is None: self.latest.pop(key, None)
+        else: self.latest[key] = json.dumps(value)
+        self.dirty.add(key)
+
+    def flush_if_due(self):
+        if self.pending and time.time() - self.last_write >= self.COALESCE_SECONDS: self.flush()
+
+    def flush(self):
+        """Queues held updates: one journal append, or a compaction when the journal is full."""
+        changed = [(key, self.latest.get(key, 'null')) for key in self.dirty if self.latest.get(key) != self.written.get(key)]
+        self.dirty.clear()
+        if not changed: return
+        if self.records + len(changed) > max(self.COMPACT_RECORDS, len(self.latest)) or not self.snapshot_id or self.torn:
+            self.compact()
+        else:
+            lines = [json.dumps({'snapshot': self.snapshot_id}) + '\n'] if self.records == 0 else []
+            lines += [f'{{"key": {json.dumps(key)}, "value": {value}}}\n' for key, value in changed]
+            submit_io(self._append, ''.join(lines), 'a' if self.records else 'w')
+            self.records += len(changed)
+            for key, _ in changed:
+                if key in self.latest: self.written[key] = self.latest[key]
+                else: self.written.pop(key, None)
+        self.last_write = time.time()
+
+    def compact(self):
+        """Queues the latest data as a new snapshot that replaces the journal."""
+        text = json.dumps({key: json.loads(value) for key, value in self.latest.items()}, indent=2)
+        submit_io(self._write_snapshot, text)
+        self.snapshot_id = hashlib.sha1(text.encode()).hexdigest(); self.records = 0; self.torn = False
+        self.written = dict(self.latest); self.dirty.clear()
+
+    def _append(self, text: str, mode: str):
+        try:
+            with self.journal.open(mode) as f:
+                f.write(text); f.flush(); os.fsync(f.fileno())
+        except IOError as e:
+            print(f"Could not save to {self.filename}: {e}")
+
+    def _write_snapshot(self, text: str):
+        try:
+            write_atomic(self.filename, text); self.journal.unlink(missing_ok=True)
+            print(f"Data saved to {self.filename}.")
+        except IOError as e:
+            print(f"Could not save to {self.filename}: {e}")
\ No newline at end of file
@@ -0,0 +1,59 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from async_io import submit_io
+from save_load import write_json, load_data
+from solver import SOLVER_VERSION
+from core import solution_to_lurd, lurd_to_solution
+
+class SolutionCache:
+    """Solver results persisted to disk, keyed by level content hash.
+
+    Each entry stores the solution as a LURD string (None if unsolvable), its length, the
+    solver version that produced it and solve stats. A file written by another SOLVER_VERSION
+    is discarded, and entries are merged with the file on every write so several machines can
+    share it. The merge and write happen on the I/O thread; the in-memory entries only change
+    on the caller's thread.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        data = load_data(self.path)
+        if not isinstance(data, dict): return {}
+        if data.get('solver_version') != SOLVER_VERSION:
+            print(f"Solution cache {self.path} is from solver version {data.get('solver_version')}, discarding it.")
+            return {}
+        return data.get('levels', {})
+
+    def __contains__(self, level_hash: str) -> bool:
+        return level_hash in self.entries
+
+    def get(self, level_hash: str) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
+        """Returns (found, solution); solution is None for levels known to be unsolvable."""
+        entry = self.entries.get(level_hash)
+        if entry is None or entry.get('solver_version') != SOLVER_VERSION: return False, None
+        return True, lurd_to_solution(entry['solution']) if entry['solution'] is not None else None
+
+    def put(self, level_hash: str, solution: Optional[List[Tuple[int, int]]], **stats):
+        """Stores a solve result with its stats (algorithm, nodes expanded, seconds...) and saves."""
+        self.entries[level_hash] = {
+            'solution': solution_to_lurd(solution) if solution is not None else None,
+            'length': len(solution) if solution is not None else None,
+            'solver_version': SOLVER_VERSION,
+            'stats': stats,
+        }
+        self.save()
+
+    def evict(self, level_hash: str):
+        if self.entries.pop(level_hash, None) is not None:
+            self.save(evicted=level_hash)
+
+    def save(self, evicted: Optional[str] = None):
+        submit_io(self._merge_and_write, dict(self.entries), evicted)
+
+    def _merge_and_write(self, entries: Dict[str, dict], evicted: Optional[str]):
+        merged = self._load(); merged.update(entries)
+        if evicted is not None: merged.pop(evicted, None)
+        write_json({'solver_version': SOLVER_VERSION, 'levels': merged}, self.path)
\ No newline at end of file
@@ -1,31 +1,776 @@
-from collections import deque
-from typing import Optional, List, Tuple
+from array import array
+import mmap
+import multiprocessing
+import os
+import tempfile
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Dict, Callable
 import numpy as np
-from constants import GameObject
-from core import move, is_win, find_player, get_targets_mask
-
-def bfs_solver(initial_board: np.ndarray, max_iters: int = 150000) -> Optional[List[Tuple[int, int]]]:
-    """Finds the shortest solution using Breadth-First Search."""
-    target_mask = get_targets_mask(initial_board)
-    
-    def get_board_key(b: np.ndarray) -> tuple:
-        player_pos = find_player(b)
-        box_pos = tuple(sorted(map(tuple, np.argwhere(b == GameObject.BOX.value))))
-        return (player_pos, box_pos)
-
-    queue = deque([(initial_board, [])])
-    visited = {get_board_key(initial_board)}
-    
-    for _ in range(max_iters):
-        if not queue: break
-        current_board, path = queue.popleft()
-        if is_win(current_board, target_mask):
-            return path
-        for direction in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            next_board = move(current_board, direction, target_mask)
-            if next_board is not None:
-                key = get_board_key(next_board)
-                if key not in visited:
-                    visited.add(key)
-                    queue.append((next_board, path + [direction]))
-    return None
\ No newline at end of file
+from core import DIRECTIONS, UNREACHABLE, LevelLayout, mask_to_cells
+
+Solution = List[Tuple[int, int]]
+
+# Bump whenever a change could alter the solutions returned, or the level hashes that key them,
+# so persisted caches are dropped. 2: levels keyed by canonical grid hash.
+SOLVER_VERSION = 2
+
+_FOUND, _EXHAUSTED = -1, -2
+
+PROGRESS_INTERVAL = 1024
+DEFAULT_MAX_ITERS = 150000
+
+@dataclass
+class SolverStats:
+    """Search counters, updated in place when passed to a solver as stats=.
+
+    If progress is set, solvers call it with the stats every PROGRESS_INTERVAL expansions
+    (or once per layer for layer-at-a-time searches), after refreshing the frontier size; peak_frontier
+    is the largest frontier seen at those samples. exhausted is set by solve() when a search
+    returned None because it hit max_iters, so the level was not proven unsolvable.
+    """
+    expanded: int = 0
+    frontier: int = 0
+    peak_frontier: int = 0
+    pruned: Dict[str, int] = field(default_factory=dict)
+    exhausted: bool = False
+    progress: Optional[Callable[['SolverStats'], None]] = field(default=None, repr=False, compare=False)
+
+    def report(self, frontier: int) -> None:
+        self.frontier = frontier; self.peak_frontier = max(self.peak_frontier, frontier)
+        if self.progress: self.progress(self)
+
+class StateTable:
+    """Append-only store of search nodes kept in flat buffers.
+
+    Each node is a fixed-width packed state key plus its parent node and the move that produced
+    it, so paths are rebuilt by following parents instead of being copied into every node.
+    """
+    def __init__(self, key_bytes: int):
+        self.key_bytes = key_bytes
+        self.keys = bytearray()
+        self.parents = array('i')
+        self.moves = array('i')
+        self.index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.index
+
+    def __enter__(self) -> 'StateTable':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Releases resources held outside the Python heap (none for the in-memory table)."""
+
+    def add(self, key: int, parent: int, move: int) -> int:
+        """Stores a new node and returns its index."""
+        node = len(self.parents)
+        self.keys += key.to_bytes(self.key_bytes, 'little')
+        self.parents.append(parent); self.moves.append(move)
+        self.index[key] = node
+        return node
+
+    def find(self, key: int) -> int:
+        """Returns the node index holding key, or -1."""
+        return self.index.get(key, -1)
+
+    def key(self, node: int) -> int:
+        start = node * self.key_bytes
+        return int.from_bytes(self.keys[start:start + self.key_bytes], 'little')
+
+    def trace(self, node: int) -> List[int]:
+        """Returns the moves leading from the root node to node."""
+        moves = []
+        while self.parents[node] >= 0:
+            moves.append(self.moves[node]); node = self.parents[node]
+        return moves[::-1]
+
+def _tag(data: bytes) -> int:
+    """Top 31 bits of a Fibonacci hash of a packed key's bytes.
+
+    Hashing the bytes rather than the int matters: an int hashes modulo 2**61 - 1, so moving a
+    box 61 bits along the key would leave its hash unchanged.
+    """
+    return (hash(data) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> 33
+
+class BoundedStateTable(StateTable):
+    """StateTable for BFS with a RAM budget, spilling expanded layers to a memory-mapped file.
+
+    The index is an open-addressing hash table in a preallocated array instead of a dict, so a
+    node costs its packed key, 8 bytes of links and 16-32 bytes of slots. Each slot holds the
+    node number plus the top 31 bits of the key's hash, so probes only read back keys whose
+    tag matches and growing the table never has to rehash keys. Once
+    the budget is exceeded, every node below spillable (set by the solver to its BFS head) is
+    moved to an anonymous temporary file and read back through mmap, for duplicate checks and
+    path tracing only. MemoryError is raised when the budget cannot be met even after spilling.
+    Nodes cannot be re-parented, so it only suits FIFO searches.
+    """
+    def __init__(self, key_bytes: int, max_memory_mb: float, spill_dir: Optional[str] = None):
+        super().__init__(key_bytes)
+        self.budget = int(max_memory_mb * 2**20); self.spill_dir = spill_dir
+        self.slots = array('q', bytes(8 * 1024)); self.bits = 10
+        # Nodes [0, spilled) live in the file as key bytes + int32 parent + int32 move records.
+        self.spilled = 0; self.spillable = 0; self.record = key_bytes + 8
+        self._file = None; self._map: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return self.spilled + len(self.parents)
+
+    def __contains__(self, key: int) -> bool:
+        return self.find(key) >= 0
+
+    def ram_bytes(self) -> int:
+        return 8 * len(self.slots) + len(self.keys) + 8 * len(self.parents)
+
+    def add(self, key: int, parent: int, move: int) -> int:
+        """Stores a new node (key must not be present yet) and returns its index."""
+        node = self.spilled + len(self.parents)
+        if 2 * (node + 1) > len(self.slots): self._grow()
+        data = key.to_bytes(self.key_bytes, 'little')
+        self.keys += data
+        self.parents.append(parent); self.moves.append(move)
+        self._insert(_tag(data), node + 1)
+        # Checked every 1024 nodes; the overshoot is small next to any useful budget.
+        if not node & 1023 and self.ram_bytes() > self.budget: self._spill()
+        return node
+
+    def find(self, key: int) -> int:
+        slots = self.slots; mask = len(slots) - 1
+        data = key.to_bytes(self.key_bytes, 'little')
+        tag = _tag(data); slot = tag >> (31 - self.bits)
+        while slots[slot]:
+            if slots[slot] >> 32 == tag:
+                node = (slots[slot] & 0xFFFFFFFF) - 1
+                if self._key_data(node) == data: return node
+            slot = (slot + 1) & mask
+        return -1
+
+    def _insert(self, tag: int, entry: int):
+        slots = self.slots; mask = len(slots) - 1
+        slot = tag >> (31 - self.bits)
+        while slots[slot]: slot = (slot + 1) & mask
+        slots[slot] = tag << 32 | entry
+
+    def key(self, node: int) -> int:
+        return int.from_bytes(self._key_data(node), 'little')
+
+    def _key_data(self, node: int) -> bytes:
+        if node >= self.spilled:
+            start = (node - self.spilled) * self.key_bytes
+            return self.keys[start:start + self.key_bytes]
+        start = node * self.record
+        return self._map[start:start + self.key_bytes]
+
+    def trace(self, node: int) -> List[int]:
+        moves = []
+        while True:
+            if node >= self.spilled:
+                parent, move = self.parents[node - self.spilled], self.moves[node - self.spilled]
+            else:
+                start = node * self.record + self.key_bytes
+                parent, move = np.frombuffer(self._map[start:start + 8], dtype='<i4').tolist()
+            if parent < 0: return moves[::-1]
+            moves.append(move); node = parent
+
+    def _grow(self):
+        # The old and new slot arrays coexist while rehashing.
+        if self.ram_bytes() + 16 * len(self.slots) > self.budget: self._spill()
+        if self.ram_bytes() + 16 * len(self.slots) > self.budget:
+            raise MemoryError(f"State table exceeded its {self.budget / 2**20:g} MB budget")
+        old = self.slots
+        self.slots = array('q', bytes(16 * len(old))); self.bits += 1
+        for entry in old:
+            if entry: self._insert(entry >> 32, entry & 0xFFFFFFFF)
+
+    def _spill(self):
+        """Moves the nodes below spillable to the spill file, raising MemoryError if that is not enough."""
+        count = self.spillable - self.spilled
+        if count > 0:
+            keys = np.frombuffer(self.keys, dtype=np.uint8, count=count * self.key_bytes).reshape(count, self.key_bytes)
+            links = np.stack([np.frombuffer(self.parents, dtype=np.int32, count=count),
+                              np.frombuffer(self.moves, dtype=np.int32, count=count)], axis=1).astype('<i4').view(np.uint8)
+            if self._file is None: self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+            if self._map is not None: self._map.close()
+            self._file.seek(0, os.SEEK_END); self._file.write(np.hstack([keys, links]).tobytes()); self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            del keys, links
+            del self.keys[:count * self.key_bytes]; del self.parents[:count]; del self.moves[:count]
+            self.spilled += count
+        if self.ram_bytes() > self.budget:
+            raise MemoryError(f"State table exceeded its {self.budget / 2**20:g} MB budget")
+
+    def close(self):
+        if self._map is not None: self._map.close(); self._map = None
+        if self._file is not None: self._file.close(); self._file = None
+
+class DeadlockDetector:
+    """Rejects pushes that leave a level unsolvable, counting how many states each rule pruned.
+
+    Rules, cheapest first: a push onto a static dead square, a 2x2 block of boxes and walls
+    holding a box off target, and a freeze deadlock where the pushed box can no longer move on
+    either axis while it or a box frozen with it sits off target.
+    """
+    RULES = ('dead_square', 'block_2x2', 'freeze')
+
+    def __init__(self, layout: LevelLayout, pruned: Optional[Dict[str, int]] = None):
+        self.height, self.width = layout.height, layout.width
+        self.floor = layout.floor.tolist(); self.neighbours = layout.neighbours.tolist()
+        self.targets = layout.targets; self.dead = layout.dead
+        self.pruned = pruned if pruned is not None else {}
+        for rule in self.RULES: self.pruned.setdefault(rule, 0)
+
+    def is_deadlock(self, boxes: int, cell: int) -> bool:
+        """Checks the state reached by pushing a box onto cell (boxes already includes it)."""
+        if self.dead >> cell & 1:
+            self.pruned['dead_square'] += 1; return True
+        if self._block_2x2(boxes, cell):
+            self.pruned['block_2x2'] += 1; return True
+        frozen: List[int] = []
+        if self._is_frozen(boxes, cell, set(), frozen) and any(not self.targets >> c & 1 for c in frozen):
+            self.pruned['freeze'] += 1; return True
+        return False
+
+    def _solid(self, boxes: int, i: int, j: int) -> bool:
+        if not (0 <= i < self.height and 0 <= j < self.width): return True
+        cell = i * self.width + j
+        return not self.floor[cell] or bool(boxes >> cell & 1)
+
+    def _box_off_target(self, boxes: int, i: int, j: int) -> bool:
+        if not (0 <= i < self.height and 0 <= j < self.width): return False
+        cell = i * self.width + j
+        return bool(boxes >> cell & 1) and not self.targets >> cell & 1
+
+    def _block_2x2(self, boxes: int, cell: int) -> bool:
+        i, j = divmod(cell, self.width)
+        for di in (-1, 1):
+            for dj in (-1, 1):
+                square = ((i, j), (i + di, j), (i, j + dj), (i + di, j + dj))
+                if not all(self._solid(boxes, *c) for c in square): continue
+                # Nothing in the block can ever move again, so one box off target loses the level.
+                if any(self._box_off_target(boxes, *c) for c in square): return True
+        return False
+
+    def _is_frozen(self, boxes: int, cell: int, chain: set, frozen: List[int]) -> bool:
+        """True if the box on cell can move along neither axis; boxes on chain count as walls."""
+        chain.add(cell); mark = len(frozen)
+        for d in (0, 2):
+            a, b = self.neighbours[cell][d], self.neighbours[cell][d + 1]
+            if a < 0 or b < 0 or a in chain or b in chain: continue
+            if self.dead >> a & 1 and self.dead >> b & 1: continue
+            if boxes >> a & 1 and self._is_frozen(boxes, a, chain, frozen): continue
+            if boxes >> b & 1 and self._is_frozen(boxes, b, chain, frozen): continue
+            chain.discard(cell); del frozen[mark:]
+            return False
+        chain.discard(cell); frozen.append(cell)
+        return True
+
+def bfs_solver(initial_board: np.ndarray, max_iters: Optional[int] = DEFAULT_MAX_ITERS, mode: str = 'step', stats: Optional[SolverStats] = None,
+               workers: int = 1, max_memory_mb: Optional[float] = None) -> Optional[Solution]:
+    """Finds the shortest solution using Breadth-First Search.
+
+    mode='step' expands one player step per node; mode='push' searches over box pushes only
+    (see push_solver). Both return the same move-optimal list of directions. mode='region'
+    only guarantees the fewest pushes, in exchange for a much smaller visited set (see
+    region_solver); use it to check solvability. Pushes onto
+    the level's dead squares (core.get_dead_squares_mask) or into other deadlocks
+    (DeadlockDetector) are dropped before they reach the visited table. Step mode expands a
+    whole layer per call to LevelLayout.successors (see _layer_bfs); workers > 1 spreads each
+    layer over that many processes instead (see parallel_bfs_solver).
+
+    max_memory_mb bounds the visited table's RAM instead (BoundedStateTable, step and region
+    modes), raising MemoryError once it cannot be met; pass max_iters=None with it to search
+    until the budget runs out rather than stopping at an iteration count.
+    """
+    if max_iters is None: max_iters = float('inf')
+    if max_memory_mb is not None and mode == 'push':
+        raise ValueError("A memory budget is only available in step and region modes")
+    if mode == 'push':
+        if workers != 1: raise ValueError("Parallel search is only available in step mode")
+        return push_solver(initial_board, max_iters, stats)
+    if mode == 'region':
+        if workers != 1: raise ValueError("Parallel search is only available in step mode")
+        return region_solver(initial_board, max_iters, stats, max_memory_mb)
+    if mode != 'step':
+        raise ValueError(f"Unknown solver mode: {mode}")
+    if workers != 1:
+        if max_memory_mb is not None: raise ValueError("A memory budget is not available for parallel search")
+        return parallel_bfs_solver(initial_board, max_iters, workers, stats)
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1]: return None
+    if start[1] & ~layout.targets == 0: return []
+    if start[1] & layout.dead: return None
+    stats = stats if stats is not None else SolverStats()
+    deadlocks = DeadlockDetector(layout, stats.pruned)
+    if max_memory_mb is None:
+        return _layer_bfs(layout, start, max_iters, stats, deadlocks)
+    neighbours = layout.neighbours.tolist(); goal = layout.targets
+
+    with BoundedStateTable(layout.key_bytes, max_memory_mb) as table:
+        table.add(layout.pack_state(*start), -1, -1)
+        # Nodes are appended in BFS order, so the frontier is simply every node past head.
+        head = 0
+        while head < len(table) and head < max_iters:
+            table.spillable = head
+            stats.expanded += 1
+            if not stats.expanded % PROGRESS_INTERVAL: stats.report(len(table) - head)
+            player, boxes = layout.unpack_state(table.key(head))
+            for d, step in enumerate(neighbours[player]):
+                if step < 0: continue
+                next_boxes = boxes
+                if boxes >> step & 1:
+                    dest = neighbours[step][d]
+                    if dest < 0 or boxes >> dest & 1: continue
+                    next_boxes = boxes ^ (1 << step) ^ (1 << dest)
+                key = layout.pack_state(step, next_boxes)
+                if key in table: continue
+                if next_boxes != boxes and deadlocks.is_deadlock(next_boxes, dest): continue
+                node = table.add(key, head, d)
+                if next_boxes != boxes and next_boxes & ~goal == 0:
+                    return [DIRECTIONS[m] for m in table.trace(node)]
+            head += 1
+    return None
+
+def _layer_bfs(layout: LevelLayout, start: Tuple[int, int], max_iters, stats: SolverStats,
+               deadlocks: 'DeadlockDetector') -> Optional[Solution]:
+    """Step-level BFS that generates a whole layer's successors with NumPy.
+
+    Only deduplication against the visited set, keyed by player and packed box bytes, and the
+    deadlock rules beyond dead squares still run per child in Python. Each layer keeps its
+    parent indices and directions so the path is traced back once a layer holds a solved state.
+    """
+    players = np.array([start[0]], dtype=np.intp); boxes = layout.pack_boxes(start[1])[None, :]
+    key_type = np.dtype((np.void, 2 + layout.box_bytes))
+    def keys(players: np.ndarray, boxes: np.ndarray) -> list:
+        return np.hstack([players.astype('<u2').view(np.uint8).reshape(-1, 2), boxes]).view(key_type).ravel().tolist()
+    visited = set(keys(players, boxes)); layers: List[Tuple[np.ndarray, np.ndarray]] = []
+    while len(players):
+        if stats.expanded >= max_iters: return None # Whole layers only, so the last may overshoot.
+        stats.expanded += len(players); stats.report(len(players))
+        valid, pushed, next_players, next_boxes = layout.successors(players, boxes)
+        parents, directions = np.nonzero(valid); pushed = pushed[parents, directions]
+        dests = layout.neighbours[next_players, directions].tolist(); is_push = pushed.tolist()
+        fresh = []
+        for i, key in enumerate(keys(next_players, next_boxes)):
+            if key in visited: continue
+            if is_push[i] and deadlocks.is_deadlock(int.from_bytes(next_boxes[i].tobytes(), 'little'), dests[i]): continue
+            visited.add(key); fresh.append(i)
+        fresh = np.array(fresh, dtype=np.intp)
+        players, boxes = next_players[fresh], next_boxes[fresh]
+        layers.append((parents[fresh].astype(np.int32), directions[fresh].astype(np.int8)))
+        solved = np.flatnonzero(pushed[fresh] & layout.solved_rows(boxes))
+        if len(solved):
+            node = int(solved[0]); moves = []
+            for parents, directions in reversed(layers):
+                moves.append(DIRECTIONS[directions[node]]); node = int(parents[node])
+            return moves[::-1]
+    return None
+
+def _bfs_table(layout: LevelLayout, max_memory_mb: Optional[float]) -> StateTable:
+    return StateTable(layout.key_bytes) if max_memory_mb is None else BoundedStateTable(layout.key_bytes, max_memory_mb)
+
+def region_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, stats: Optional[SolverStats] = None,
+                  max_memory_mb: Optional[float] = None) -> Optional[Solution]:
+    """Finds a solution with the fewest pushes by BFS over pushes, keyed by the player's region.
+
+    Between two pushes the player can stand anywhere in its reachable region, so a state is
+    keyed on the box layout plus the region's top-left-most cell (LevelLayout.normalize_player)
+    instead of the exact player cell. That stores each layout once per region rather than once
+    per push position, but walking costs are lost: the result is push-optimal, not move-optimal.
+    max_memory_mb bounds the visited table as in bfs_solver.
+    """
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1] or start[1] & layout.dead: return None
+    neighbours = layout.neighbours.tolist(); goal = layout.targets
+    if start[1] & ~goal == 0: return []
+    stats = stats if stats is not None else SolverStats()
+    deadlocks = DeadlockDetector(layout, stats.pruned)
+
+    with _bfs_table(layout, max_memory_mb) as table:
+        table.add(layout.pack_state(layout.normalize_player(*start)[0], start[1]), -1, -1)
+        head = 0
+        while head < len(table) and head < max_iters:
+            table.spillable = head
+            stats.expanded += 1
+            if not stats.expanded % PROGRESS_INTERVAL: stats.report(len(table) - head)
+            player, boxes = layout.unpack_state(table.key(head))
+            reach = layout.reach_mask(player, boxes)
+            for box in mask_to_cells(boxes):
+                for d, dest in enumerate(neighbours[box]):
+                    stand = neighbours[box][d ^ 1]
+                    if dest < 0 or stand < 0 or boxes >> dest & 1 or not reach >> stand & 1: continue
+                    next_boxes = boxes ^ (1 << box) ^ (1 << dest)
+                    # Checked before the visited table here: normalizing the child costs a flood fill.
+                    if deadlocks.is_deadlock(next_boxes, dest): continue
+                    key = layout.pack_state(layout.normalize_player(box, next_boxes)[0], next_boxes)
+                    if key in table: continue
+                    node = table.add(key, head, box * 4 + d)
+                    if next_boxes & ~goal == 0:
+                        return _push_moves(neighbours, start, table.trace(node))
+            head += 1
+    return None
+
+def _reachable(neighbours: list, boxes: int, start: int) -> Dict[int, int]:
+    """Flood-fills the player's region around the boxes, returning {cell: walking distance}."""
+    dist = {start: 0}; frontier = [start]; steps = 0
+    while frontier:
+        steps += 1; next_frontier = []
+        for cell in frontier:
+            for n in neighbours[cell]:
+                if n >= 0 and n not in dist and not boxes >> n & 1:
+                    dist[n] = steps; next_frontier.append(n)
+        frontier = next_frontier
+    return dist
+
+def _walk(neighbours: list, boxes: int, start: int, goal: int) -> List[int]:
+    """Returns the direction indices of a shortest walk from start to goal around the boxes."""
+    prev = {start: (-1, -1)}; frontier = [start]
+    while frontier and goal not in prev:
+        next_frontier = []
+        for cell in frontier:
+            for d, n in enumerate(neighbours[cell]):
+                if n >= 0 and n not in prev and not boxes >> n & 1:
+                    prev[n] = (cell, d); next_frontier.append(n)
+        frontier = next_frontier
+    steps = []
+    while goal != start:
+        goal, d = prev[goal]; steps.append(d)
+    return steps[::-1]
+
+class MatchingHeuristic:
+    """Lower bound on the moves left: a minimum-cost matching of boxes to targets by push distance.
+
+    Every push moves one box one cell, so the cheapest assignment of boxes to distinct targets
+    never overestimates; UNREACHABLE means no assignment exists and the state is lost.
+    """
+    def __init__(self, layout: LevelLayout):
+        self.distances = layout.push_distances.T.tolist()
+
+    def __call__(self, boxes: int) -> int:
+        rows = [self.distances[cell] for cell in mask_to_cells(boxes)]
+        if len(rows) > len(rows[0]): return UNREACHABLE # More boxes than targets: never solvable.
+        if len(rows) == 1: return min(rows[0])
+        return min(_min_assignment(rows), UNREACHABLE)
+
+def _min_assignment(cost: List[List[int]]) -> int:
+    """Minimum total cost of giving each row its own column (Hungarian algorithm, rows <= columns)."""
+    n, m = len(cost), len(cost[0])
+    u = [0] * (n + 1); v = [0] * (m + 1); match = [0] * (m + 1); way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row; col = 0
+        minv = [float('inf')] * (m + 1); used = [False] * (m + 1)
+        while match[col]:
+            used[col] = True; i = match[col]; delta = float('inf'); next_col = 0
+            for j in range(1, m + 1):
+                if used[j]: continue
+                reduced = cost[i - 1][j - 1] - u[i] - v[j]
+                if reduced < minv[j]: minv[j] = reduced; way[j] = col
+                if minv[j] < delta: delta = minv[j]; next_col = j
+            for j in range(m + 1):
+                if used[j]: u[match[j]] += delta; v[j] -= delta
+                else: minv[j] -= delta
+            col = next_col
+        while col:
+            prev = way[col]; match[col] = match[prev]; col = prev
+    return -v[0]
+
+def push_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, stats: Optional[SolverStats] = None) -> Optional[Solution]:
+    """Finds a move-optimal solution by searching over box pushes instead of single steps.
+
+    Each node is a box layout plus the player's cell right after the last push; its edges are
+    the pushes the player can walk to. Nodes are expanded in order of total moves (walk + push),
+    so the first winning node popped is as short as the step-level BFS result. Walking paths
+    between pushes are only rebuilt for the final solution.
+    """
+    return _best_first_push_search(initial_board, max_iters, stats, None)
+
+def astar_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, stats: Optional[SolverStats] = None) -> Optional[Solution]:
+    """Finds a move-optimal solution with A* over box pushes, guided by MatchingHeuristic."""
+    return _best_first_push_search(initial_board, max_iters, stats, MatchingHeuristic)
+
+def _best_first_push_search(initial_board: np.ndarray, max_iters: int, stats: Optional[SolverStats], heuristic) -> Optional[Solution]:
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1] or start[1] & layout.dead: return None
+    neighbours = layout.neighbours.tolist(); goal = layout.targets
+    stats = stats if stats is not None else SolverStats()
+    deadlocks = DeadlockDetector(layout, stats.pruned)
+    estimate = heuristic(layout) if heuristic else (lambda boxes: 0)
+    if estimate(start[1]) >= UNREACHABLE: return None
+
+    table = StateTable(layout.key_bytes); costs = array('i', [0]); estimates = array('i', [estimate(start[1])])
+    table.add(layout.pack_state(*start), -1, -1)
+    # Bucket queue keyed by moves so far plus the estimate; a node is re-queued when a cheaper
+    # route to it is found, and stale entries are skipped when their bucket comes up.
+    buckets: Dict[int, array] = {estimates[0]: array('i', [0])}
+    while buckets:
+        bound = min(buckets)
+        for node in buckets.pop(bound):
+            cost = costs[node]
+            if cost + estimates[node] != bound: continue
+            if stats.expanded >= max_iters: return None
+            stats.expanded += 1
+            if not stats.expanded % PROGRESS_INTERVAL: stats.report(len(table) - stats.expanded)
+            player, boxes = layout.unpack_state(table.key(node))
+            if boxes & ~goal == 0:
+                return _push_moves(neighbours, start, table.trace(node))
+            reach = _reachable(neighbours, boxes, player)
+            for box in mask_to_cells(boxes):
+                for d, dest in enumerate(neighbours[box]):
+                    stand = neighbours[box][d ^ 1]
+                    if dest < 0 or boxes >> dest & 1 or stand not in reach: continue
+                    child_cost = cost + reach[stand] + 1
+                    next_boxes = boxes ^ (1 << box) ^ (1 << dest)
+                    key = layout.pack_state(box, next_boxes)
+                    child = table.find(key)
+                    if child < 0:
+                        if deadlocks.is_deadlock(next_boxes, dest): continue
+                        child_estimate = estimate(next_boxes)
+                        if child_estimate >= UNREACHABLE: continue
+                        child = table.add(key, node, box * 4 + d); costs.append(child_cost); estimates.append(child_estimate)
+                    elif child_cost < costs[child]:
+                        table.parents[child] = node; table.moves[child] = box * 4 + d; costs[child] = child_cost
+                    else: continue
+                    buckets.setdefault(child_cost + estimates[child], array('i')).append(child)
+    return None
+
+def ida_star_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, stats: Optional[SolverStats] = None) -> Optional[Solution]:
+    """Finds a move-optimal solution with IDA* over box pushes, guided by MatchingHeuristic.
+
+    Memory stays proportional to the solution length: only the current line of pushes is kept,
+    at the price of re-expanding states on every deepening pass.
+    """
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1] or start[1] & layout.dead: return None
+    neighbours = layout.neighbours.tolist(); goal = layout.targets
+    stats = stats if stats is not None else SolverStats()
+    deadlocks = DeadlockDetector(layout, stats.pruned)
+    estimate = MatchingHeuristic(layout)
+    pushes: List[int] = []; on_path = {layout.pack_state(*start)}
+
+    def search(player: int, boxes: int, cost: int, bound: int) -> int:
+        """Returns _FOUND, _EXHAUSTED or the smallest f-value that exceeded bound."""
+        f = cost + estimate(boxes)
+        if f > bound: return f
+        if boxes & ~goal == 0: return _FOUND
+        if stats.expanded >= max_iters: return _EXHAUSTED
+        stats.expanded += 1
+        if not stats.expanded % PROGRESS_INTERVAL: stats.report(len(pushes))
+        reach = _reachable(neighbours, boxes, player); next_bound = UNREACHABLE
+        for box in mask_to_cells(boxes):
+            for d, dest in enumerate(neighbours[box]):
+                stand = neighbours[box][d ^ 1]
+                if dest < 0 or boxes >> dest & 1 or stand not in reach: continue
+                next_boxes = boxes ^ (1 << box) ^ (1 << dest)
+                key = layout.pack_state(box, next_boxes)
+                if key in on_path or deadlocks.is_deadlock(next_boxes, dest): continue
+                on_path.add(key); pushes.append(box * 4 + d)
+                result = search(box, next_boxes, cost + reach[stand] + 1, bound)
+                if result < 0: return result
+                on_path.discard(key); pushes.pop()
+                next_bound = min(next_bound, result)
+        return next_bound
+
+    bound = estimate(start[1])
+    while bound < UNREACHABLE:
+        bound = search(start[0], start[1], 0, bound)
+        if bound == _FOUND: return _push_moves(neighbours, start, pushes)
+        if bound == _EXHAUSTED: return None
+    return None
+
+def _push_moves(neighbours: list, start: Tuple[int, int], pushes: List[int]) -> Solution:
+    """Expands a list of pushes (box cell * 4 + direction) into the full list of player moves."""
+    player, boxes = start
+    path: Solution = []
+    for push in pushes:
+        box, d = divmod(push, 4)
+        path.extend(DIRECTIONS[s] for s in _walk(neighbours, boxes, player, neighbours[box][d ^ 1]))
+        path.append(DIRECTIONS[d])
+        boxes ^= (1 << box) | (1 << neighbours[box][d]); player = box
+    return path
+
+def bidirectional_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, stats: Optional[SolverStats] = None) -> Optional[Solution]:
+    """Finds a move-optimal solution by meeting a forward BFS with a backward BFS of pulls.
+
+    The backward side starts from the solved box layout with the player on every free cell of
+    its region, and undoes moves: stepping back, optionally pulling the box in front along.
+    Whole layers are expanded on the smaller side; once a layer produces a state the other side
+    has seen, the shortest of that layer's meetings is stitched into the move list. Levels with
+    more targets than boxes have no single solved layout and fall back to bfs_solver.
+    """
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1] or start[1] & layout.dead: return None
+    goal = layout.targets
+    if start[1] & ~goal == 0: return []
+    if bin(start[1]).count('1') != bin(goal).count('1'):
+        return bfs_solver(initial_board, max_iters, stats=stats)
+    neighbours = layout.neighbours.tolist()
+    stats = stats if stats is not None else SolverStats()
+    deadlocks = DeadlockDetector(layout, stats.pruned)
+
+    forward = StateTable(layout.key_bytes); backward = StateTable(layout.key_bytes)
+    forward.add(layout.pack_state(*start), -1, -1)
+    for cell in _reachable(neighbours, 0, start[0]):
+        if not goal >> cell & 1: backward.add(layout.pack_state(cell, goal), -1, -1)
+    # Both tables are filled in BFS order, so each layer is a contiguous range of node indices.
+    layers = {forward: [0, 1], backward: [0, len(backward)]}
+
+    while stats.expanded < max_iters:
+        side = forward if layers[forward][-1] - layers[forward][-2] <= layers[backward][-1] - layers[backward][-2] else backward
+        other = backward if side is forward else forward
+        lo, hi = layers[side][-2:]
+        if lo == hi: return None
+        meetings = []
+        for node in range(lo, hi):
+            stats.expanded += 1
+            if not stats.expanded % PROGRESS_INTERVAL: stats.report(len(forward) + len(backward) - stats.expanded)
+            player, boxes = layout.unpack_state(side.key(node))
+            children = _forward_moves(neighbours, deadlocks, player, boxes) if side is forward else _backward_moves(neighbours, player, boxes)
+            for d, next_player, next_boxes in children:
+                key = layout.pack_state(next_player, next_boxes)
+                if key in side: continue
+                child = side.add(key, node, d)
+                match = other.find(key)
+                if match >= 0: meetings.append((bisect_right(layers[other], match), child, match))
+        layers[side].append(len(side))
+        if meetings:
+            _, child, match = min(meetings)
+            f_node, b_node = (child, match) if side is forward else (match, child)
+            return [DIRECTIONS[d] for d in forward.trace(f_node) + backward.trace(b_node)[::-1]]
+    return None
+
+def _forward_moves(neighbours: list, deadlocks: DeadlockDetector, player: int, boxes: int):
+    """Yields (direction, player, boxes) for every legal step or push from a state."""
+    for d, step in enumerate(neighbours[player]):
+        if step < 0: continue
+        if boxes >> step & 1:
+            dest = neighbours[step][d]
+            if dest < 0 or boxes >> dest & 1: continue
+            next_boxes = boxes ^ (1 << step) ^ (1 << dest)
+            if deadlocks.is_deadlock(next_boxes, dest): continue
+            yield d, step, next_boxes
+        else:
+            yield d, step, boxes
+
+def _backward_moves(neighbours: list, player: int, boxes: int):
+    """Yields (direction, player, boxes) for every state whose move in direction leads here."""
+    for d, box in enumerate(neighbours[player]):
+        prev = neighbours[player][d ^ 1]
+        if prev < 0 or boxes >> prev & 1: continue
+        yield d, prev, boxes
+        if box >= 0 and boxes >> box & 1:
+            yield d, prev, boxes ^ (1 << box) ^ (1 << player)
+
+def parallel_bfs_solver(initial_board: np.ndarray, max_iters: int = DEFAULT_MAX_ITERS, workers: Optional[int] = None,
+                        stats: Optional[SolverStats] = None) -> Optional[Solution]:
+    """Step-level BFS spread over worker processes, one per hash partition of the state space.
+
+    Each worker owns the visited states whose key hashes to its partition. Layer by layer, the
+    coordinator hands every worker the candidates it owns; workers drop the ones they have seen,
+    report any solved state, then expand the rest and return the children bucketed by owner.
+    Layers stay in lockstep, so the first solved state reported is move-optimal. workers=None
+    uses every core; a single worker runs the plain bfs_solver.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return bfs_solver(initial_board, max_iters, stats=stats)
+    layout = LevelLayout(initial_board)
+    start = layout.initial_state(initial_board)
+    if start is None or not start[1]: return None
+    if start[1] & ~layout.targets == 0: return []
+    if start[1] & layout.dead: return None
+    stats = stats if stats is not None else SolverStats()
+
+    pipes, processes = [], []
+    for index in range(workers):
+        parent_end, child_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_partition_worker, args=(child_end, initial_board, workers, index), daemon=True)
+        process.start(); pipes.append(parent_end); processes.append(process)
+    try:
+        start_key = layout.pack_state(*start)
+        incoming: List[list] = [[] for _ in range(workers)]
+        incoming[hash(start_key) % workers].append((start_key, -1, -1))
+        while True:
+            for conn, batch in zip(pipes, incoming): conn.send(('accept', batch))
+            replies = [conn.recv() for conn in pipes]
+            solved = next((key for key, _ in replies if key is not None), None)
+            if solved is not None:
+                return _trace_partitions(pipes, solved)
+            fresh = sum(count for _, count in replies)
+            if not fresh: return None
+            if stats.expanded + fresh > max_iters: stats.exhausted = True; return None
+            stats.expanded += fresh; stats.report(fresh)
+            for conn in pipes: conn.send(('expand', None))
+            incoming = [[] for _ in range(workers)]
+            for conn in pipes:
+                buckets, pruned = conn.recv()
+                for owner, bucket in enumerate(buckets): incoming[owner].extend(bucket)
+                for rule, hits in pruned.items(): stats.pruned[rule] = stats.pruned.get(rule, 0) + hits
+    finally:
+        for conn in pipes:
+            try: conn.send(('stop', None))
+            except OSError: pass
+        for process in processes: process.join()
+
+def _trace_partitions(pipes: list, key: int) -> Solution:
+    """Rebuilds a path by asking each state's owning worker for its parent."""
+    moves = []
+    while True:
+        conn = pipes[hash(key) % len(pipes)]
+        conn.send(('parent', key)); key, d = conn.recv()
+        if key < 0: return [DIRECTIONS[m] for m in reversed(moves)]
+        moves.append(d)
+
+def _partition_worker(conn, initial_board: np.ndarray, workers: int, index: int):
+    """Worker process of parallel_bfs_solver owning one partition of the visited states."""
+    layout = LevelLayout(initial_board); neighbours = layout.neighbours.tolist(); goal = layout.targets
+    pruned: Dict[str, int] = {}
+    deadlocks = DeadlockDetector(layout, pruned)
+    parents: Dict[int, Tuple[int, int]] = {}
+    fresh: List[int] = []
+    while True:
+        command, payload = conn.recv()
+        if command == 'accept':
+            fresh = []; solved = None
+            for key, parent, d in payload:
+                if key in parents: continue
+                parents[key] = (parent, d); fresh.append(key)
+                if solved is None and layout.unpack_state(key)[1] & ~goal == 0: solved = key
+            conn.send((solved, len(fresh)))
+        elif command == 'expand':
+            buckets: List[list] = [[] for _ in range(workers)]
+            for key in fresh:
+                player, boxes = layout.unpack_state(key)
+                for d, next_player, next_boxes in _forward_moves(neighbours, deadlocks, player, boxes):
+                    child = layout.pack_state(next_player, next_boxes); owner = hash(child) % workers
+                    if owner == index and child in parents: continue
+                    buckets[owner].append((child, key, d))
+            conn.send((buckets, dict(pruned)))
+            for rule in pruned: pruned[rule] = 0
+        elif command == 'parent':
+            conn.send(parents[payload])
+        else:
+            return
+
+ALGORITHMS = {'bfs': bfs_solver, 'push': push_solver, 'astar': astar_solver, 'idastar': ida_star_solver,
+              'bidirectional': bidirectional_solver, 'parallel': parallel_bfs_solver}
+
+def solve(initial_board: np.ndarray, algorithm: str = 'astar', **kwargs) -> Optional[Solution]:
+    """Runs the named solver from ALGORITHMS; all of them return move-optimal solutions, except bfs
+    with mode='region', which only guarantees the fewest pushes."""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown solver algorithm: {algorithm}")
+    if kwargs.get('stats') is None: kwargs['stats'] = SolverStats()
+    stats = kwargs['stats']; max_iters = kwargs.get('max_iters', DEFAULT_MAX_ITERS)
+    solution = ALGORITHMS[algorithm](initial_board, **kwargs)
+    if solution is None and max_iters is not None and stats.expanded >= max_iters: stats.exhausted = True
+    return solution
\ No newline at end of file
@@ -0,0 +1,68 @@
+import multiprocessing
+import queue
+import time
+from typing import Optional, List, Tuple
+import numpy as np
+
+from solver import solve, SolverStats
+
+class SolverJob:
+    """Runs a solver in a background process so the game loop keeps rendering.
+
+    Call poll() once per frame: it collects progress (nodes expanded, frontier size, nodes/s)
+    and returns True once the result is in. cancel() stops the search immediately. Platforms
+    without subprocesses (the browser build) solve synchronously on creation instead.
+    """
+    def __init__(self, board: np.ndarray, algorithm: str = 'astar'):
+        self.solution: Optional[List[Tuple[int, int]]] = None
+        self.done = False; self.cancelled = False; self.failed = False; self.exhausted = False
+        self.expanded = 0; self.frontier = 0; self.nodes_per_second = 0.0
+        self.algorithm = algorithm; self.start_time = time.time(); self.end_time: Optional[float] = None
+        try:
+            self._queue = multiprocessing.Queue()
+            self._process = multiprocessing.Process(target=_run_solver, args=(board, algorithm, self._queue), daemon=True)
+            self._process.start()
+        except (ImportError, OSError, NotImplementedError) as e:
+            print(f"!! WARNING: Could not start background solver, solving in the foreground: {e}")
+            self._process = None
+            stats = SolverStats(); self.solution = solve(board, algorithm, stats=stats)
+            self.expanded = stats.expanded; self.exhausted = stats.exhausted; self.done = True; self.end_time = time.time()
+
+    def poll(self) -> bool:
+        """Drains pending progress messages; returns True once the job has finished."""
+        if self.done: return True
+        alive = self._process.is_alive()
+        try:
+            while True:
+                message = self._queue.get_nowait()
+                if message[0] == 'progress':
+                    _, self.expanded, self.frontier = message
+                else:
+                    _, self.solution, self.expanded, self.exhausted = message; self.done = True
+        except queue.Empty:
+            pass
+        elapsed = time.time() - self.start_time
+        self.nodes_per_second = self.expanded / elapsed if elapsed > 0 else 0.0
+        if not self.done and not alive:
+            print(f"!! ERROR: Background solver exited with code {self._process.exitcode}")
+            self.done = True; self.failed = True
+        if self.done: self._process.join(); self.end_time = time.time()
+        return self.done
+
+    def stats(self) -> dict:
+        """Solve stats of a finished job, in the form taken by game.store_solution."""
+        return {'algorithm': self.algorithm, 'expanded': self.expanded, 'seconds': round((self.end_time or time.time()) - self.start_time, 3),
+                'exhausted': self.exhausted}
+
+    def cancel(self):
+        """Stops the search; the job then counts as done with no solution."""
+        if self.done: return
+        if self._process is not None:
+            self._process.terminate(); self._process.join()
+        self.done = True; self.cancelled = True
+
+def _run_solver(board: np.ndarray, algorithm: str, messages):
+    """Background process entry point: solves the board and streams progress to messages."""
+    stats = SolverStats(progress=lambda s: messages.put(('progress', s.expanded, s.frontier)))
+    solution = solve(board, algorithm, stats=stats)
+    messages.put(('done', solution, stats.expanded, stats.exhausted))
\ No newline at end of file
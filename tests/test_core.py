@@ -0,0 +1,52 @@
+import pytest
+
+from core import DIRECTIONS, LevelLayout, MoveHistory, get_initial_board, lurd_to_solution
+
+# Two boxes, each two pushes left of its target.
+LEVEL = [
+    [-1, -1, -1, -1, -1, -1],
+    [-1,  3,  2,  0,  1, -1],
+    [-1,  0,  2,  0,  1, -1],
+    [-1,  0,  0,  0,  0, -1],
+    [-1, -1, -1, -1, -1, -1],
+]
+SOLUTION = 'RRlldRR'
+
+@pytest.fixture
+def history():
+    board = get_initial_board(LEVEL); layout = LevelLayout(board)
+    return MoveHistory(layout, layout.initial_state(board))
+
+def play(history, moves):
+    for direction in lurd_to_solution(moves): assert history.push(direction) is not None
+
+def test_solution_wins_and_is_recorded(history):
+    play(history, SOLUTION)
+    assert history.is_solved and history.on_targets == 2
+    assert history.to_lurd() == SOLUTION and len(history) == len(SOLUTION)
+
+def test_blocked_move_is_rejected(history):
+    assert history.push(DIRECTIONS[0]) is None # Wall above the player.
+    assert len(history) == 0
+
+def test_undo_redo_round_trip(history):
+    play(history, SOLUTION); states = [history.state_at(i) for i in range(len(SOLUTION) + 1)]
+    for i in range(len(SOLUTION), 0, -1):
+        assert history.undo() == states[i - 1]
+    assert history.undo() is None and history.state == history.start and history.on_targets == 0
+    for i in range(1, len(SOLUTION) + 1):
+        assert history.redo() == states[i]
+    assert history.redo() is None and history.is_solved
+
+def test_new_move_clears_redo(history):
+    play(history, 'RR'); history.undo()
+    play(history, 'l')
+    assert history.redo() is None and history.to_lurd() == 'Rl'
+
+def test_state_at_across_checkpoints(history, monkeypatch):
+    monkeypatch.setattr(MoveHistory, 'CHECKPOINT_INTERVAL', 4)
+    play(history, 'dudududududu'); states = [history.state]
+    for _ in range(12): states.append(history.undo())
+    for _ in range(12): history.redo()
+    assert [history.state_at(i) for i in range(13)] == states[::-1]
+    assert len(history.checkpoints) == 4
\ No newline at end of file
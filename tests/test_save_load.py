@@ -0,0 +1,45 @@
+import pytest
+
+from save_load import JournaledFile
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(JournaledFile, 'COALESCE_SECONDS', 0)
+    return JournaledFile(tmp_path / 'save.json')
+
+def test_missing_file_loads_none(store):
+    assert store.load() is None
+
+def test_save_and_reload(store):
+    store.load(); store.save({'A': {'scores': {'base_0': 3}}, 'B': {'scores': {}}})
+    assert JournaledFile(store.filename).load() == {'A': {'scores': {'base_0': 3}}, 'B': {'scores': {}}}
+
+def test_changes_are_journaled(store):
+    store.load(); store.save({'A': 1, 'B': 2})
+    snapshot = store.filename.read_text()
+    store.save({'A': 1, 'B': 3}); store.set('C', 4); store.flush(); store.set('A', None); store.flush()
+    assert store.filename.read_text() == snapshot
+    assert len(store.journal.read_text().splitlines()) == 4 # Snapshot header plus one record per change.
+    assert JournaledFile(store.filename).load() == {'B': 3, 'C': 4}
+
+def test_torn_record_is_ignored_and_repaired(store):
+    store.load(); store.save({'A': 1}); store.save({'A': 1, 'B': 2})
+    with store.journal.open('a') as f: f.write('{"key": "C", "val')
+    reloaded = JournaledFile(store.filename); data = reloaded.load()
+    assert data == {'A': 1, 'B': 2}
+    data['D'] = 4; reloaded.save(data); data['E'] = 5; reloaded.save(data)
+    assert JournaledFile(store.filename).load() == {'A': 1, 'B': 2, 'D': 4, 'E': 5}
+
+def test_stale_journal_is_ignored(store):
+    store.load(); store.save({'A': 1}); store.save({'A': 2})
+    stale = store.journal.read_text()
+    store.compact() # As if a crash struck between the new snapshot and removing the journal.
+    store.save({'A': 3}); store.compact(); store.journal.write_text(stale)
+    assert JournaledFile(store.filename).load() == {'A': 3}
+
+def test_journal_is_compacted(store, monkeypatch):
+    monkeypatch.setattr(JournaledFile, 'COMPACT_RECORDS', 4)
+    store.load(); data = {'A': 0, 'B': 0}
+    for i in range(10): data['A'] = i; store.save(data)
+    assert store.records <= 4
+    assert JournaledFile(store.filename).load() == data
\ No newline at end of file
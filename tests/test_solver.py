@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import solver
+
+# Two boxes, one target: no box-to-target assignment exists.
+MORE_BOXES_THAN_TARGETS = np.array([
+    [-1, -1, -1, -1, -1, -1, -1],
+    [-1,  3,  0,  2,  0,  1, -1],
+    [-1,  0,  0,  2,  0,  0, -1],
+    [-1,  0,  0,  0,  0,  0, -1],
+    [-1, -1, -1, -1, -1, -1, -1],
+])
+
+@pytest.mark.parametrize('algorithm', sorted(solver.ALGORITHMS))
+def test_more_boxes_than_targets_is_unsolvable(algorithm):
+    stats = solver.SolverStats()
+    assert solver.solve(MORE_BOXES_THAN_TARGETS, algorithm, stats=stats) is None
+    assert not stats.exhausted
+def _initial_boards():
+    from game import INITIAL_LEVELS, get_initial_board
+    return [get_initial_board(level) for level in INITIAL_LEVELS]
+
+@pytest.fixture(scope='module')
+def optimal_lengths():
+    """Move-optimal lengths of the built-in levels, from the plain step-level BFS."""
+    return [len(solver.solve(board, 'bfs')) for board in _initial_boards()]
+
+@pytest.mark.parametrize('algorithm', sorted(solver.ALGORITHMS))
+def test_initial_levels_solved_optimally(algorithm, optimal_lengths):
+    from core import LevelLayout, solution_to_lurd
+    for board, optimal in zip(_initial_boards(), optimal_lengths):
+        solution = solver.solve(board, algorithm)
+        assert solution is not None and len(solution) == optimal
+        layout = LevelLayout(board); moves = solution_to_lurd(solution)
+        state, played, _ = layout.replay(layout.initial_state(board), moves)
+        assert played == len(moves) and layout.is_win(state)
+
+def test_exhausted_search_is_flagged():
+    stats = solver.SolverStats()
+    assert solver.solve(_initial_boards()[-1], 'astar', max_iters=5, stats=stats) is None
+    assert stats.exhausted
\ No newline at end of file
@@ -4,20 +4,19 @@ import asyncio
 import pygame
 import numpy as np
 import time
-from typing import Tuple, Optional, List
-from pathlib import Path
+from typing import Dict, Tuple, Optional, List
 import random
-import os
-import re
 from datetime import datetime
 
 from config import GameConfig, DEFAULT_THEME as THEME
 from assets import AssetManager
 import game
-from core import get_initial_board
-from save_load import save_data, load_data
+from core import get_initial_board, get_level_hash, mask_to_cells
+from solver_jobs import SolverJob
 
 player_animator = None
+_STATIC_LAYERS: Dict[tuple, pygame.Surface] = {}
+STATIC_LAYER_CACHE_SIZE = 8
 
 # --- UI Helper Classes and Functions ---
 class AnimatedPlayer:
@@ -47,6 +46,18 @@ class FloatingObject:
         if self.y < -self.sprite.get_height() or self.x < -self.sprite.get_width() or self.x > self.W:
             self.y = self.H; self.x = random.randint(0, self.W)
 
+def _draw_player(screen, rect, assets, player_direction, animate=True):
+    sprite_key = 'player_front'
+    if player_direction == (-1, 0): sprite_key = 'player_back'
+    elif player_direction == (0, -1): sprite_key = 'player_left'
+    elif player_direction == (0, 1): sprite_key = 'player_right'
+    player_sprite = assets.images[sprite_key]
+    if player_animator and animate:
+        player_animator.set_sprite(player_sprite); player_animator.update(); player_sprite = player_animator.sprite
+    player_rect = player_sprite.get_rect(center=rect.center)
+    if player_animator and animate: player_rect.y += player_animator.y_offset
+    return screen.blit(player_sprite, player_rect)
+
 def draw_board_and_objects(screen, board, assets, offset=(0,0), is_editor=False, target_mask=None, player_direction=(1,0)):
     h, w = board.shape; start_x, start_y = offset; bg_tile = assets.images['floor']
     for i in range(h):
@@ -59,17 +70,68 @@ def draw_board_and_objects(screen, board, assets, offset=(0,0), is_editor=False,
             if is_target_location: screen.blit(assets.images['target'], rect.topleft)
             if cell == game.GameObject.WALL.value: screen.blit(assets.images['wall'], rect.topleft)
             elif cell == game.GameObject.BOX.value: screen.blit(assets.images['box'], rect.topleft)
-            elif cell == game.GameObject.PLAYER.value:
-                sprite_key = 'player_front'
-                if player_direction == (-1, 0): sprite_key = 'player_back'
-                elif player_direction == (0, -1): sprite_key = 'player_left'
-                elif player_direction == (0, 1): sprite_key = 'player_right'
-                player_sprite = assets.images[sprite_key]
-                if player_animator and not is_editor:
-                    player_animator.set_sprite(player_sprite); player_animator.update(); player_sprite = player_animator.sprite
-                player_rect = player_sprite.get_rect(center=rect.center)
-                if player_animator and not is_editor: player_rect.y += player_animator.y_offset
-                screen.blit(player_sprite, player_rect)
+            elif cell == game.GameObject.PLAYER.value: _draw_player(screen, rect, assets, player_direction, animate=not is_editor)
+
+def static_layer(layout, assets) -> pygame.Surface:
+    """The floor, targets and walls of a level pre-rendered at the current tile size, cached per level."""
+    ts = assets.config.TILE_SIZE; key = (ts, layout.width, layout.tiles.tobytes())
+    surface = _STATIC_LAYERS.get(key)
+    if surface is None:
+        if len(_STATIC_LAYERS) >= STATIC_LAYER_CACHE_SIZE: _STATIC_LAYERS.clear()
+        surface = pygame.Surface((layout.width * ts, layout.height * ts)).convert()
+        wall, target = game.GameObject.WALL.value, game.GameObject.TARGET.value
+        for cell, tile in enumerate(layout.tiles.tolist()):
+            pos = (cell % layout.width * ts, cell // layout.width * ts)
+            surface.blit(assets.images['floor'], pos)
+            if tile == target: surface.blit(assets.images['target'], pos)
+            if tile == wall: surface.blit(assets.images['wall'], pos)
+        _STATIC_LAYERS[key] = surface
+    return surface
+
+def draw_level_state(screen, layout, state, assets, offset=(0,0), player_direction=(1,0)) -> pygame.Rect:
+    """Draws a level from its cached static layer plus a compact State; returns the player's rect."""
+    start_x, start_y = offset; ts = assets.config.TILE_SIZE
+    screen.blit(static_layer(layout, assets), offset)
+    for cell in mask_to_cells(state.boxes): screen.blit(assets.images['box'], (start_x + cell % layout.width * ts, start_y + cell // layout.width * ts))
+    i, j = divmod(state.player, layout.width)
+    return _draw_player(screen, pygame.Rect(start_x + j * ts, start_y + i * ts, ts, ts), assets, player_direction)
+
+class BoardView:
+    """Keeps a drawn level up to date with dirty rects instead of full redraws.
+
+    draw() paints the whole board; update() then repaints only the cells whose box or player
+    changed since the last frame, plus the animated player, and returns the rects to pass to
+    pygame.display.update().
+    """
+    def __init__(self, layout, assets):
+        self.layout = layout; self.assets = assets
+        self.offset = (0, 0); self.boxes = 0; self.player = 0; self.player_rect: Optional[pygame.Rect] = None
+
+    def _cell_rect(self, cell: int) -> pygame.Rect:
+        ts = self.assets.config.TILE_SIZE; i, j = divmod(cell, self.layout.width)
+        return pygame.Rect(self.offset[0] + j * ts, self.offset[1] + i * ts, ts, ts)
+
+    def draw(self, screen, state, offset, player_direction):
+        self.offset = offset; self.boxes = state.boxes; self.player = state.player
+        self.player_rect = draw_level_state(screen, self.layout, state, self.assets, offset, player_direction)
+
+    def update(self, screen, state, player_direction) -> List[pygame.Rect]:
+        layout, assets, ts = self.layout, self.assets, self.assets.config.TILE_SIZE
+        dirty = [self._cell_rect(cell) for cell in mask_to_cells(self.boxes ^ state.boxes)]
+        dirty += [self._cell_rect(self.player), self._cell_rect(state.player), self.player_rect]
+        board_rect = pygame.Rect(self.offset, (layout.width * ts, layout.height * ts)); layer = static_layer(layout, assets)
+        for rect in dirty: # The player sprite overhangs its cell, so this can reach neighbours or the background.
+            screen.set_clip(rect); screen.fill(assets.theme['BG'])
+            if 'background' in assets.images: screen.blit(assets.images['background'], (0, 0))
+            screen.blit(layer, self.offset)
+            area = rect.clip(board_rect)
+            for i in range((area.top - board_rect.top) // ts, (area.bottom - 1 - board_rect.top) // ts + 1) if area else ():
+                for j in range((area.left - board_rect.left) // ts, (area.right - 1 - board_rect.left) // ts + 1):
+                    if state.boxes >> (i * layout.width + j) & 1: screen.blit(assets.images['box'], (board_rect.left + j * ts, board_rect.top + i * ts))
+        screen.set_clip(None)
+        self.boxes = state.boxes; self.player = state.player
+        self.player_rect = _draw_player(screen, self._cell_rect(state.player), assets, player_direction)
+        return dirty + [self.player_rect]
 
 def draw_gradient_rect(screen, rect, color1, color2, vertical=True):
     surface = pygame.Surface((rect.width, rect.height))
@@ -287,7 +349,7 @@ async def show_player_select_screen(screen, assets):
                             'scores': {}, 
                             'last_played': datetime.now().strftime("%Y-%m-%d %H:%M")
                         }
-                        save_data(game.LEVEL_STARS, Path(game.SAVE_FILE))
+                        game.save_progress()
                         assets.sounds['win'].play(); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT"
                     elif clean_name in players:
                         game.CURRENT_PLAYER_NAME = clean_name
@@ -381,7 +443,7 @@ async def show_level_select(screen, assets, levels_to_display: List[dict], mode:
                     can_delete = mode == 'custom' and levels_to_display[selected_level_idx].get('creator') == game.CURRENT_PLAYER_NAME
                     if can_delete and delete_button.collidepoint(pos):
                         if await show_confirmation_dialog(screen, assets, "Delete this level?"):
-                            game.delete_custom_level(levels_to_display[selected_level_idx]['key']); return "MODE_SELECT", None, None
+                            await game.delete_custom_level(levels_to_display[selected_level_idx]['key']); return "MODE_SELECT", None, None
                 
                 selected_level_idx_before = selected_level_idx
                 selected_level_idx = None
@@ -430,20 +492,21 @@ async def play_level(screen, assets, level_key, level_idx, mode):
     global player_animator
     pygame.mixer.music.fadeout(1000)
     await fade_transition(screen, assets, fade_in=True)
-    levels_list = game.BASE_LEVELS if mode == 'main' else game.CUSTOM_LEVELS
-    level_data = next((lvl['data'] for lvl in levels_list if lvl['key'] == level_key), None)
+    level_info = game.LEVELS.get(level_key)
+    level_data = await game.open_level(level_info) if level_info and level_info['mode'] == mode else None
     if level_data is None: return "MODE_SELECT", None, None
-    level_name_display = next((lvl['name'] for lvl in levels_list if lvl['key'] == level_key), "Sokoban")
+    level_name_display = level_info['name']
+    prev_level, next_level = game.LEVELS.neighbours(level_key)
 
     game_state = game.GameState(level_key, level_data, assets)
-    player_animator = AnimatedPlayer(assets.images['player_front'])
+    player_animator = AnimatedPlayer(assets.images['player_front']); board_view = BoardView(game_state.layout, assets)
+    level_text = assets.font_large.render(level_name_display, True, assets.theme['TEXT'])
     
-    last_auto_move = time.time(); clock = pygame.time.Clock(); move_flash = 0
+    last_auto_move = time.time(); clock = pygame.time.Clock(); move_flash = 0; last_frame = None
     rankings = game.get_player_rankings(); old_rank = next((i+1 for i, p in enumerate(rankings) if p['name'] == game.CURRENT_PLAYER_NAME), len(rankings)+1)
     
     while True:
         W, H = screen.get_size()
-        level_text = assets.font_large.render(level_name_display, True, assets.theme['TEXT'])
         text_rect = level_text.get_rect(centerx=W // 2, centery=assets.config.HEADER_HEIGHT // 2)
         btn_size_h, btn_spacing = 60, 15
         nav_buttons = {
@@ -456,18 +519,22 @@ async def play_level(screen, assets, level_key, level_idx, mode):
             "Restart": pygame.Rect(20, H - btn_h_b - 20, btn_w_b, btn_h_b), 
             "Solve": pygame.Rect(20 + btn_w_b + btn_s_b, H - btn_h_b - 20, btn_w_b, btn_h_b)
         }
-        board_w = game_state.current_board.shape[1] * assets.config.TILE_SIZE
-        board_h = game_state.current_board.shape[0] * assets.config.TILE_SIZE
+        board_w = game_state.layout.width * assets.config.TILE_SIZE
+        board_h = game_state.layout.height * assets.config.TILE_SIZE
         board_offset = ((W - board_w) // 2, assets.config.HEADER_HEIGHT + (H - assets.config.HEADER_HEIGHT - board_h) // 2)
 
         for event in pygame.event.get():
-            if event.type == pygame.QUIT: return "QUIT", None, None
+            if event.type == pygame.QUIT: game_state.cancel_solver(); return "QUIT", None, None
+            if event.type == pygame.VIDEOEXPOSE: last_frame = None
             if event.type == pygame.KEYDOWN:
                 key_map = {pygame.K_UP: (-1, 0), pygame.K_w: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_s: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_a: (0, -1), pygame.K_RIGHT: (0, 1), pygame.K_d: (0, 1)}
                 if event.key in key_map:
                     if game_state.perform_move(key_map[event.key]): player_animator.trigger_move(); move_flash = 5
                 elif event.key == pygame.K_z or event.key == pygame.K_u: game_state.undo()
+                elif event.key == pygame.K_y: game_state.redo()
+                elif event.key == pygame.K_ESCAPE and game_state.solver_job: game_state.cancel_solver(); assets.sounds['button'].play()
                 elif event.key in (pygame.K_ESCAPE, pygame.K_m):
+                    game_state.cancel_solver()
                     new_rank = next((i+1 for i,p in enumerate(game.get_player_rankings()) if p['name']==game.CURRENT_PLAYER_NAME), old_rank+1)
                     await show_rank_popup(screen, assets, old_rank, new_rank); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT", None, None
                 elif event.key == pygame.K_r: game_state.restart(); assets.sounds['button'].play()
@@ -475,28 +542,46 @@ async def play_level(screen, assets, level_key, level_idx, mode):
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 pos = event.pos
                 if nav_buttons["menu"].collidepoint(pos):
+                    game_state.cancel_solver()
                     new_rank = next((i+1 for i,p in enumerate(game.get_player_rankings()) if p['name']==game.CURRENT_PLAYER_NAME), old_rank+1)
                     await show_rank_popup(screen, assets, old_rank, new_rank); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT", None, None
-                if nav_buttons["prev"].collidepoint(pos) and level_idx > 0:
-                    new_idx = level_idx - 1; new_key = levels_list[new_idx]['key']; assets.sounds['button'].play(); await fade_transition(screen, assets, fade_in=False); return "PLAY", new_idx, new_key
-                if nav_buttons["next"].collidepoint(pos) and level_idx < len(levels_list) - 1:
-                    new_idx = level_idx + 1; new_key = levels_list[new_idx]['key']; assets.sounds['button'].play(); await fade_transition(screen, assets, fade_in=False); return "PLAY", new_idx, new_key
+                if nav_buttons["prev"].collidepoint(pos) and prev_level:
+                    game_state.cancel_solver(); new_idx, new_key = prev_level['index'], prev_level['key']; assets.sounds['button'].play(); await fade_transition(screen, assets, fade_in=False); return "PLAY", new_idx, new_key
+                if nav_buttons["next"].collidepoint(pos) and next_level:
+                    game_state.cancel_solver(); new_idx, new_key = next_level['index'], next_level['key']; assets.sounds['button'].play(); await fade_transition(screen, assets, fade_in=False); return "PLAY", new_idx, new_key
                 if bottom_buttons["Restart"].collidepoint(pos): game_state.restart(); assets.sounds['button'].play()
-                if bottom_buttons["Solve"].collidepoint(pos): assets.sounds['button'].play(); game_state.start_solver()
+                if bottom_buttons["Solve"].collidepoint(pos):
+                    assets.sounds['button'].play()
+                    if game_state.solver_job: game_state.cancel_solver()
+                    else: game_state.start_solver()
 
+        game_state.poll_solver(); game.poll_grading_jobs(); game.SAVE_STORE.flush_if_due()
         if game_state.auto_play and time.time() - last_auto_move > game_state.auto_play_speed: game_state.step_solver(); player_animator.trigger_move(); move_flash = 5; last_auto_move = time.time()
-        screen.fill(assets.theme['BG'])
-        if 'background' in assets.images: screen.blit(assets.images['background'],(0,0))
-        if move_flash > 0: flash_surface = pygame.Surface((W, H)); flash_surface.set_alpha(move_flash * 20); flash_surface.fill((255, 255, 255)); screen.blit(flash_surface, (0, 0)); move_flash -= 1
-        draw_board_and_objects(screen, game_state.current_board, assets, board_offset, target_mask=game_state.target_mask, player_direction=game_state.player_direction)
-        screen.blit(level_text, text_rect); draw_header_button(screen, nav_buttons['menu'], 'Menu', assets); draw_header_button(screen, nav_buttons['prev'], '<', assets, enabled=level_idx > 0); draw_header_button(screen, nav_buttons['next'], '>', assets, enabled=level_idx < len(levels_list) - 1)
-        for name, rect in bottom_buttons.items(): draw_header_button(screen, rect, name, assets)
-        elapsed_time = time.time() - (game_state.win_time if game_state.is_won else game_state.start_time); moves_count = len(game_state.move_stack) - 1; score_text = f"Moves: {moves_count} | Time: {int(elapsed_time)}"; score_surf = assets.font_small.render(score_text, True, assets.theme['TEXT']); screen.blit(score_surf, score_surf.get_rect(right=W-20, bottom=H-20))
-        if game_state.is_won:
-            win_text = assets.font_large.render("Level Complete!", True, assets.theme['WIN']); screen.blit(win_text, win_text.get_rect(centerx=W // 2, bottom=H - 80))
-            player_stars = game.get_stars_for_player(game.CURRENT_PLAYER_NAME)
-            for s in range(3): star_center = (W//2 - 40 + s * 40, H - 45); color = assets.theme['STAR'] if s < player_stars.get(game_state.level_key, 0) else (80, 90, 100); draw_star(screen, star_center, 20, color)
-        pygame.display.flip(); await asyncio.sleep(0); clock.tick(assets.config.FPS)
+        elapsed_time = time.time() - (game_state.win_time if game_state.is_won else game_state.start_time); moves_count = len(game_state.history); score_text = f"Moves: {moves_count} | Time: {int(elapsed_time)}"
+        if game_state.solver_job:
+            job = game_state.solver_job; dots = "." * (int(time.time() * 2) % 3 + 1)
+            status_text = f"Solving{dots:<3} {job.expanded:,} nodes ({int(job.nodes_per_second):,}/s) | frontier {job.frontier:,} | Esc to cancel"
+        elif game_state.is_repeated_position and not game_state.auto_play and not game_state.is_won: status_text = "You have been here before - try Undo"
+        else: status_text = ""
+        star_count = game.get_stars_for_player(game.CURRENT_PLAYER_NAME).get(game_state.level_key, 0) if game_state.is_won else 0
+        # Everything but the board only changes with this; while it holds, just the changed cells are redrawn.
+        frame = (W, H, board_offset, score_text, status_text, game_state.is_won, star_count, game_state.solver_job is None)
+        if frame == last_frame and move_flash == 0:
+            pygame.display.update(board_view.update(screen, game_state.current_state, game_state.player_direction))
+        else:
+            screen.fill(assets.theme['BG'])
+            if 'background' in assets.images: screen.blit(assets.images['background'],(0,0))
+            if move_flash > 0: flash_surface = pygame.Surface((W, H)); flash_surface.set_alpha(move_flash * 20); flash_surface.fill((255, 255, 255)); screen.blit(flash_surface, (0, 0)); move_flash -= 1; frame = None
+            board_view.draw(screen, game_state.current_state, board_offset, game_state.player_direction)
+            screen.blit(level_text, text_rect); draw_header_button(screen, nav_buttons['menu'], 'Menu', assets); draw_header_button(screen, nav_buttons['prev'], '<', assets, enabled=prev_level is not None); draw_header_button(screen, nav_buttons['next'], '>', assets, enabled=next_level is not None)
+            for name, rect in bottom_buttons.items(): draw_header_button(screen, rect, "Cancel" if name == "Solve" and game_state.solver_job else name, assets)
+            if status_text: status_surf = assets.font_small.render(status_text, True, assets.theme['TEXT']); screen.blit(status_surf, status_surf.get_rect(centerx=W // 2, bottom=H - 120))
+            score_surf = assets.font_small.render(score_text, True, assets.theme['TEXT']); screen.blit(score_surf, score_surf.get_rect(right=W-20, bottom=H-20))
+            if game_state.is_won:
+                win_text = assets.font_large.render("Level Complete!", True, assets.theme['WIN']); screen.blit(win_text, win_text.get_rect(centerx=W // 2, bottom=H - 80))
+                for s in range(3): star_center = (W//2 - 40 + s * 40, H - 45); color = assets.theme['STAR'] if s < star_count else (80, 90, 100); draw_star(screen, star_center, 20, color)
+            pygame.display.flip()
+        last_frame = frame; await asyncio.sleep(0); clock.tick(assets.config.FPS)
     player_animator = None
 
 async def level_editor(screen, assets):
@@ -510,6 +595,7 @@ async def level_editor(screen, assets):
     current_tool = game.GameObject.WALL
     
     mouse_down = False; message = ""; message_color = 'red'; message_timer = 0; clock = pygame.time.Clock()
+    test_job = None; tested_level = None; warned_key = None
     
     while True:
         W, H = screen.get_size()
@@ -529,18 +615,37 @@ async def level_editor(screen, assets):
 
         mouse_pos = pygame.mouse.get_pos()
         if message_timer > 0: message_timer -= 1
+
+        if test_job and test_job.poll():
+            solvable = test_job.solution is not None; cancelled = test_job.cancelled or test_job.failed; exhausted = test_job.exhausted
+            print(f"Level Check:{'SOLVABLE' if solvable else 'CANCELLED' if cancelled else 'GAVE UP' if exhausted else 'UNSOLVABLE'}")
+            if not cancelled: game.record_solution(get_level_hash(get_initial_board(tested_level)), test_job.solution, **test_job.stats())
+            test_job = None
+            if solvable:
+                await game.save_custom_level(tested_level); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT"
+            if not cancelled: message = "Too hard to check!" if exhausted else "Unsolvable!"; message_color = assets.theme['EDITOR_MSG_BAD']; message_timer = 120
         
         for event in pygame.event.get():
-            if event.type == pygame.QUIT: return "QUIT"
+            if event.type == pygame.QUIT:
+                if test_job: test_job.cancel()
+                return "QUIT"
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if back_btn.collidepoint(mouse_pos):
+                    if test_job: test_job.cancel()
+                    await fade_transition(screen, assets, fade_in=False); return "MAIN_MENU"
+                if test_job: continue
                 mouse_down = True
-                if back_btn.collidepoint(mouse_pos): await fade_transition(screen, assets, fade_in=False); return "MAIN_MENU"
                 if save_btn.collidepoint(mouse_pos):
                     p_count=np.count_nonzero(board==game.GameObject.PLAYER.value); b_count=np.count_nonzero(board==game.GameObject.BOX.value); t_count=np.count_nonzero(board==game.GameObject.TARGET.value)
                     if p_count == 1 and b_count > 0 and b_count == t_count:
-                        if game.solve_new_level(board.tolist()):
-                            game.save_custom_level(board.tolist()); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT"
-                        else: message = "Unsolvable!"; message_color = assets.theme['EDITOR_MSG_BAD']; message_timer = 120
+                        tested_level = board.tolist(); duplicate = game.find_duplicate_level(tested_level)
+                        if duplicate and warned_key != duplicate['key']: # A second click saves the copy anyway.
+                            warned_key = duplicate['key']; message = f"Same as {duplicate['name']}!"; message_color = assets.theme['EDITOR_MSG_BAD']; message_timer = 120
+                        else:
+                            found, solution = game.get_board_solution(board)
+                            if found and solution: await game.save_custom_level(tested_level); await fade_transition(screen, assets, fade_in=False); return "MODE_SELECT"
+                            elif found: message = "Unsolvable!"; message_color = assets.theme['EDITOR_MSG_BAD']; message_timer = 120
+                            else: print("Checking level solvability..."); test_job = SolverJob(board.copy())
                     else: message = "Invalid Layout!"; message_color = assets.theme['EDITOR_MSG_BAD']; message_timer = 120
                 
                 clicked_on_palette = False
@@ -561,7 +666,9 @@ async def level_editor(screen, assets):
                     grid_col = (mouse_pos[0] - board_offset_x) // ts; grid_row = (mouse_pos[1] - board_offset_y) // ts
                     if 0 <= grid_row < EDITOR_H and 0 <= grid_col < EDITOR_W: board[grid_row, grid_col] = current_tool
             
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: await fade_transition(screen, assets, fade_in=False); return "MAIN_MENU"
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                if test_job: test_job.cancel(); message = "Test cancelled"; message_color = assets.theme['EDITOR_TEXT']; message_timer = 120; continue
+                await fade_transition(screen, assets, fade_in=False); return "MAIN_MENU"
         
         screen.fill(assets.theme['BG']);
         if 'background' in assets.images: screen.blit(assets.images['background'], (0,0))
@@ -574,6 +681,7 @@ async def level_editor(screen, assets):
         elif b_count == 0: help_text="Needs Boxes"
         elif b_count != t_count: help_text=f"{abs(b_count - t_count)} more {'Targets' if b_count > t_count else 'Boxes'}"
         else: help_text = "Ready to Test!"
+        if test_job: help_text = f"Testing... {test_job.expanded:,} nodes"
         
         help_surf = assets.font_small.render(help_text, True, assets.theme['WIN'] if valid_level else assets.theme['EDITOR_TEXT'])
         screen.blit(help_surf, help_surf.get_rect(centerx=palette_x + 90, y=H - 260))
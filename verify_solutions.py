@@ -0,0 +1,143 @@
+"""Bulk solution verifier: replays LURD move strings and re-grades the stars they earn.
+
+    python verify_solutions.py [SUBMISSIONS ...] [--no-save] [--workers N] [--format csv|json] [-o FILE]
+
+Checks every winning run recorded in sokoban_save.json (unless --no-save) plus the submissions
+in each given JSON Lines file, one {"player": ..., "level": ..., "moves": "LURD..."} object per
+line. Each row reports whether the moves are legal and solve the level, the move and push
+counts, and the stars they earn against the optimal length in sokoban_solutions.json next to
+the stars claimed in the save file. Levels without a cached optimal get no star rating.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # game imports pygame; keep stdout clean for the report.
+import game
+from core import LevelLayout, get_initial_board, get_level_hash
+from save_load import JournaledFile, load_level, LEVEL_SUFFIXES
+from solution_cache import SolutionCache
+
+REPORT_FIELDS = ['player', 'level', 'status', 'moves', 'pushes', 'optimal', 'stars', 'claimed_stars']
+CHUNK_SIZE = 256
+
+_LEVELS: Dict[str, list] = {}
+_OPTIMAL: Dict[str, int] = {}
+_LAYOUTS: Dict[str, Tuple[LevelLayout, tuple]] = {}
+
+def load_levels(custom_dir: Path) -> Dict[str, list]:
+    """Level grids by key: base_N for the built-in levels, the file name for custom ones."""
+    levels = {f'base_{i}': grid for i, grid in enumerate(game.INITIAL_LEVELS)}
+    if custom_dir.is_dir():
+        for file_path in custom_dir.iterdir():
+            data = load_level(file_path) if file_path.suffix in LEVEL_SUFFIXES else None
+            if isinstance(data, list): levels[file_path.name] = data
+    return levels
+
+def optimal_lengths(levels: Dict[str, list], cache: SolutionCache) -> Dict[str, int]:
+    """Cached optimal solution lengths by level key; unsolved or unsolvable levels are left out."""
+    lengths = {}
+    for key, grid in levels.items():
+        found, solution = cache.get(get_level_hash(get_initial_board(grid)))
+        if found and solution: lengths[key] = len(solution)
+    return lengths
+
+def iter_save_runs(save: dict) -> Iterator[Tuple[str, str, str, Optional[int]]]:
+    """Yields (player, level, moves, claimed stars) for every winning run in a save file."""
+    for player, player_data in save.items():
+        if not isinstance(player_data, dict): continue
+        scores = player_data.get('scores', {})
+        for level, moves in player_data.get('solutions', {}).items(): yield player, level, moves, scores.get(level)
+
+def iter_submissions(path: Path) -> Iterator[Tuple[str, str, str, Optional[int]]]:
+    with path.open() as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip(): continue
+            try:
+                entry = json.loads(line); yield entry.get('player', ''), entry['level'], entry['moves'], entry.get('stars')
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                print(f"Skipping {path}:{line_number}: not a submission object", file=sys.stderr)
+
+def _set_levels(levels: Dict[str, list], optimal: Dict[str, int]):
+    global _LEVELS, _OPTIMAL
+    _LEVELS, _OPTIMAL = levels, optimal; _LAYOUTS.clear()
+
+def _init_worker(levels: Dict[str, list], optimal: Dict[str, int]):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C is handled by the parent, which terminates the pool.
+    _set_levels(levels, optimal)
+
+def verify(submission: Tuple[str, str, str, Optional[int]]) -> dict:
+    """Replays one submission on its level's compact state and returns its report row."""
+    player, level, moves, claimed = submission
+    row = dict.fromkeys(REPORT_FIELDS, ''); row.update(player=player, level=level, claimed_stars='' if claimed is None else claimed)
+    if level not in _LEVELS:
+        row['status'] = 'unknown_level'; return row
+    if level not in _LAYOUTS:
+        board = get_initial_board(_LEVELS[level]); layout = LevelLayout(board); _LAYOUTS[level] = layout, layout.initial_state(board)
+    layout, start = _LAYOUTS[level]
+    try:
+        state, played, pushes = layout.replay(start, moves)
+    except (ValueError, TypeError):
+        row['status'] = 'bad_moves'; return row
+    row.update(moves=played, pushes=pushes)
+    if played < len(moves): row['status'] = 'illegal_move' # moves holds the legal prefix's length.
+    elif not layout.is_win(state): row['status'] = 'unsolved'
+    else:
+        optimal = _OPTIMAL.get(level)
+        row.update(status='valid', optimal='' if optimal is None else optimal, stars='' if optimal is None else game.rate_solution(played, optimal))
+    return row
+
+def run_verify(submissions, levels: Dict[str, list], optimal: Dict[str, int], out, fmt: str = 'csv', workers: Optional[int] = None) -> dict:
+    """Verifies submissions, across worker processes unless workers is 1, writing rows in order."""
+    writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS) if fmt == 'csv' else None
+    if writer: writer.writeheader()
+    counts = {}
+    def write(rows):
+        for row in rows:
+            if writer: writer.writerow(row)
+            else: out.write(json.dumps(row) + '\n')
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+    if workers == 1:
+        _set_levels(levels, optimal); write(map(verify, submissions))
+    else:
+        with multiprocessing.Pool(workers or os.cpu_count() or 1, initializer=_init_worker, initargs=(levels, optimal)) as pool:
+            write(pool.imap(verify, submissions, chunksize=CHUNK_SIZE))
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-verify Sokoban solutions and the stars they earn.")
+    parser.add_argument('submissions', nargs='*', type=Path, help="JSON Lines files of {player, level, moves} submissions")
+    parser.add_argument('--save', type=Path, default=Path(game.SAVE_FILE), help="save file whose recorded runs are checked")
+    parser.add_argument('--no-save', action='store_true', help="skip the runs recorded in the save file")
+    parser.add_argument('--solutions', type=Path, default=Path(game.SOLUTIONS_FILE), help="solution cache with the optimal lengths")
+    parser.add_argument('--custom-dir', type=Path, default=game.CUSTOM_LEVELS_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv', help="CSV or JSON Lines")
+    parser.add_argument('-o', '--output', type=Path, default=None, help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    levels = load_levels(args.custom_dir); optimal = optimal_lengths(levels, SolutionCache(args.solutions))
+    submissions = []
+    if not args.no_save: submissions.extend(iter_save_runs(JournaledFile(args.save).load() or {}))
+    for path in args.submissions: submissions.extend(iter_submissions(path))
+    out = args.output.open('w', newline='') if args.output else sys.stdout
+    start = time.time()
+    try:
+        counts = run_verify(submissions, levels, optimal, out, args.format, args.workers)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr); return 1
+    finally:
+        if args.output: out.close()
+    summary = ', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"Verified {len(submissions)} submissions in {time.time() - start:.1f}s: {summary or 'none'}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file